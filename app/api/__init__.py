@@ -1,4 +1,5 @@
 from .audio import router as audio_router
 from .video import router as video_router
+from .upload import router as upload_router
 
-__all__ = ["audio_router", "video_router"]
\ No newline at end of file
+__all__ = ["audio_router", "video_router", "upload_router"]
\ No newline at end of file
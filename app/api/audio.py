@@ -1,60 +1,324 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-import tempfile
-import os
-import whisper
+from pydantic import BaseModel
 import asyncio
-import subprocess
 
-os.environ["PATH"] += os.pathsep + r"C:\ffmpeg\ffmpeg-7.1.1-essentials_build\ffmpeg-7.1.1-essentials_build\bin"
+from app.services.decoder import SAMPLE_RATE, StreamingDecoder, DecodeError, decode_audio
+from app.services.streaming import StreamingTranscriber
+from app.services.inference import QueueFullError
+from app.services import transcriber
+from app.services.inference_server import client as inference_client, InferenceServerError
+from app.services.registry import registry
+from app.services.cache import TranscriptCache
+from app.services.vad import VoiceActivityDetector
+from app.services import metrics, prosody, verbal
+from app.services.metrics import stage
+from app.core import config
+from .events import parse_event
 
 router = APIRouter()
-model = whisper.load_model("medium")
+
+cache = TranscriptCache(config.TRANSCRIPT_CACHE_SIZE, config.TRANSCRIPT_CACHE_DIR)
+vad = VoiceActivityDetector()
+
+metrics.Counter("interview_transcript_cache_hits_total", "전사 캐시 적중 수", fn=lambda: cache.hits)
+metrics.Counter("interview_transcript_cache_misses_total", "전사 캐시 미스 수", fn=lambda: cache.misses)
+metrics.Counter("interview_vad_input_seconds_total", "VAD에 들어온 오디오 길이", fn=lambda: vad.input_seconds)
+metrics.Counter("interview_vad_speech_seconds_total", "VAD를 통과한 발화 길이", fn=lambda: vad.speech_seconds)
+
+
+async def transcribe_audio(audio, on_queued=None):
+    # 무음 구간을 잘라 발화만 추론하고, 세그먼트 시각은 원본 타임라인으로 되돌린다
+    if config.VAD_ENABLED:
+        with stage("vad"):
+            speech, timeline = await asyncio.to_thread(vad.trim, audio)
+        if not len(speech):
+            return {"text": "", "segments": [], "language": registry.language}
+        return timeline.remap(await _transcribe_speech(speech, on_queued))
+    return await _transcribe_speech(audio, on_queued)
+
+
+async def _transcribe_speech(audio, on_queued=None):
+    with stage("inference"):
+        # INFERENCE_SOCKET이 설정되어 있으면 모델은 공유 추론 서버에만 있다
+        if inference_client is not None:
+            return await inference_client.transcribe(audio, on_queued=on_queued)
+        return await transcriber.transcribe_local(audio, on_queued=on_queued)
+
+
+def verbal_feedback(text, duration=None):
+    # 전사 결과로 개념 설명력/용어 정확성/문제 해결 로직 전달 행을 만든다 (수 ms 이내)
+    with stage("verbal"):
+        stats = verbal.analyze(text, duration)
+        rows = verbal.score_rows(stats)
+    return {"verbal": rows, "verbal_stats": stats}
+
+
+async def analyze_prosody(audio, segments=None, text=None):
+    # 이미 디코딩된 오디오와 세그먼트 시각을 그대로 써서 말하기 속도/쉼/음높이 통계를 낸다
+    with stage("prosody"):
+        return await asyncio.to_thread(prosody.analyze, audio, segments, text)
+
+
+def prosody_feedback(stats):
+    # 통계에서 어조 높낮이/말하기 속도 행을 만든다 (점수식만 적용하므로 캐시된 통계로도 바로 계산한다)
+    return {"nonverbal": prosody.score_rows(stats), "prosody": stats}
+
+
+async def send_queue_position(websocket: WebSocket, position):
+    await websocket.send_json({"queue_position": position})
+
+
+DECODE_FAILED = {"transcript": "", "expression": "ffmpeg 변환 실패"}
+
+
+def busy_response(e: QueueFullError):
+    return {"transcript": "", "error": "busy", "queue_depth": e.depth}
+
+
+# 공유 추론 서버(INFERENCE_SOCKET)에 연결할 수 없거나 서버가 오류를 돌려준 경우
+INFERENCE_UNAVAILABLE = {"transcript": "", "error": "inference_unavailable"}
+
+
+async def send_busy(websocket: WebSocket, e: QueueFullError):
+    print("⏳ 추론 대기열 초과:", e.depth)
+    await websocket.send_json(busy_response(e))
+
+
+@router.get("/inference/status")
+async def inference_status():
+    if inference_client is not None:
+        inference = (await inference_client.status()).get("inference", {})
+    else:
+        inference = transcriber.stats()
+    return {**inference, "cache": cache.stats(), "vad": vad.stats()}
+
+
+class VerbalRequest(BaseModel):
+    text: str = ""
+    duration: float | None = None
+
+
+@router.post("/verbal")
+async def verbal_analysis(payload: VerbalRequest):
+    # 텍스트로 입력한 답변도 같은 기준으로 평가한다
+    return verbal_feedback(payload.text, payload.duration)
+
 
 @router.websocket("/ws/transcript")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
 
+    mode = websocket.query_params.get("mode")
+    if mode == "stream":
+        async with metrics.request("transcript_stream", profile=False):
+            await stream_transcript(websocket)
+        return
+    if mode == "session":
+        async with metrics.request("transcript_session", profile=False):
+            await interview_session(websocket)
+        return
+
+    async with metrics.request("transcript"):
+        await transcribe_once(websocket)
+
+
+async def process_answer(data: bytes, on_queued=None):
+    # 1. 같은 녹음을 다시 보낸 경우(재시도/연습 모드) 디코딩과 Whisper 없이 캐시된 전사와 운율 통계를 쓴다.
+    #    평가 기준(용어집, 점수식)이 바뀌어도 반영되도록 점수 행은 캐시하지 않고 매번 다시 계산한다
+    with stage("cache"):
+        cache_key = TranscriptCache.key(data, registry.default, registry.language)
+        entry = await cache.get(cache_key)
+
+    if entry is not None:
+        print("⚡ 캐시 적중:", cache_key[:12])
+    else:
+        # 2. ffmpeg 파이프 디코딩 (임시 파일 없이 메모리에서 바로 16kHz PCM으로 변환)
+        with stage("decode"):
+            audio = await decode_audio(data)
+
+        # 3. Whisper로 텍스트 추출, 같은 오디오로 운율 통계
+        result = await transcribe_audio(audio, on_queued=on_queued)
+        print("📝 STT 결과:", result["text"])
+        entry = {
+            "text": result["text"],
+            "segments": [{"start": s["start"], "end": s["end"], "text": s["text"]} for s in result["segments"]],
+            "language": result.get("language"),
+            "duration": len(audio) / SAMPLE_RATE,
+            "prosody": await analyze_prosody(audio, result["segments"]),
+        }
+        # 빈 결과(VAD가 발화를 찾지 못한 경우 등)는 다시 계산해도 싸므로 캐시하지 않는다
+        if entry["segments"]:
+            await cache.put(cache_key, entry)
+
+    return {
+        "transcript": entry["text"],
+        **verbal_feedback(entry["text"], entry["duration"]),
+        **prosody_feedback(entry["prosody"]),
+    }
+
+
+async def transcribe_once(websocket: WebSocket):
     try:
         # 1. 질문 단위로 전체 WebM 수신
-        data = await websocket.receive_bytes()
+        with stage("upload"):
+            data = await websocket.receive_bytes()
         print("🔔 전체 WebM 데이터 수신:", len(data))
 
-        # 2. 임시 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as f:
-            f.write(data)
-            f.flush()
-            os.fsync(f.fileno())
-            webm_path = f.name
-
-        await asyncio.sleep(0.1)
-        wav_path = webm_path.replace(".webm", ".wav")
-
-        # 3. ffmpeg 변환
-        ffmpeg_cmd = [
-            "ffmpeg", "-i", webm_path,
-            "-ar", "16000", "-ac", "1", "-f", "wav",
-            wav_path, "-y", "-loglevel", "error"
-        ]
-        print("🔧 ffmpeg 변환 명령어:", ' '.join(ffmpeg_cmd))
-
-        result = subprocess.run(ffmpeg_cmd, capture_output=True)
-        if result.returncode != 0:
-            print("❌ ffmpeg 변환 실패:", result.stderr.decode())
-            await websocket.send_json({"transcript": "", "expression": "ffmpeg 변환 실패"})
-            #os.remove(webm_path)
+        # 2. 캐시 확인 → 디코딩 → STT
+        response = await process_answer(data, on_queued=lambda p: send_queue_position(websocket, p))
+
+        # 3. 결과 전송
+        with stage("send"):
+            await websocket.send_json(response)
+
+    except DecodeError as e:
+        print("❌ ffmpeg 변환 실패:", e)
+        await websocket.send_json(DECODE_FAILED)
+    except QueueFullError as e:
+        await send_busy(websocket, e)
+    except InferenceServerError as e:
+        print("❌ 추론 서버 오류:", e)
+        await websocket.send_json(INFERENCE_UNAVAILABLE)
+    except WebSocketDisconnect:
+        print("🔌 WebSocket 연결 종료")
+
+
+async def interview_session(websocket: WebSocket):
+    # 면접 전체를 연결 하나로 처리한다.
+    # {"event": "answer", "question_id": ...} 다음에 오는 바이너리 메시지가 그 질문의 답변 WebM이고,
+    # 답변 N을 전사하는 동안 답변 N+1을 받을 수 있으며 결과는 끝나는 순서대로 question_id와 함께 보낸다.
+    send_lock = asyncio.Lock()
+    slots = asyncio.Semaphore(config.SESSION_MAX_INFLIGHT)
+    tasks = set()
+    question_id = None
+    answers = 0
+
+    async def send(message):
+        async with send_lock:
+            await websocket.send_json(message)
+
+    async def answer(qid, data):
+        try:
+            response = await process_answer(
+                data, on_queued=lambda p: send({"question_id": qid, "queue_position": p}))
+            with stage("send"):
+                await send({"question_id": qid, **response})
+        except DecodeError as e:
+            print("❌ ffmpeg 변환 실패:", qid, e)
+            await send({"question_id": qid, **DECODE_FAILED})
+        except QueueFullError as e:
+            print("⏳ 추론 대기열 초과:", e.depth)
+            await send({"question_id": qid, **busy_response(e)})
+        except InferenceServerError as e:
+            print("❌ 추론 서버 오류:", qid, e)
+            await send({"question_id": qid, **INFERENCE_UNAVAILABLE})
+        except Exception as e:
+            # 답변 하나의 실패(모델 오류, OOM 등)로 세션이 끝나지 않도록 그 질문의 오류만 보낸다
+            print("❌ 답변 처리 실패:", qid, repr(e))
+            await send({"question_id": qid, "transcript": "", "error": str(e) or type(e).__name__})
+        finally:
+            slots.release()
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            if message.get("bytes") is not None:
+                answers += 1
+                qid = question_id if question_id is not None else answers
+                question_id = None
+                print("🔔 답변 WebM 수신:", qid, len(message["bytes"]))
+                # 한 세션이 동시에 물고 있는 답변 수를 제한해 업로드만 계속 쌓이지 않게 한다
+                await slots.acquire()
+                task = asyncio.create_task(answer(qid, message["bytes"]))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            elif message.get("text"):
+                event = parse_event(message["text"])
+                if event is None:
+                    continue
+                if event.get("event") == "answer":
+                    question_id = event.get("question_id")
+                elif event.get("event") == "end":
+                    break
+
+        # 남은 답변의 결과를 모두 보낸 뒤 세션 종료를 알린다
+        await asyncio.gather(*tasks)
+        await send({"event": "end", "answers": answers})
+
+    except WebSocketDisconnect:
+        print("🔌 면접 세션 WebSocket 연결 종료")
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def stream_transcript(websocket: WebSocket):
+    # 녹음 중 MediaRecorder 청크를 바이너리로 받고, {"event": "end"} 텍스트 메시지로 답변 종료를 알린다
+    decoder = StreamingDecoder()
+    transcriber = StreamingTranscriber(transcribe_audio)
+    pending = None
+
+    async def send_partial():
+        try:
+            partial = await transcriber.update(decoder.audio())
+        except QueueFullError:
+            # 부분 결과는 건너뛰어도 되므로 대기열이 가득 차면 다음 청크에서 다시 시도한다
             return
+        if partial is not None:
+            await websocket.send_json({"partial": partial})
 
-        # 4. Whisper로 텍스트 추출
-        result = model.transcribe(wav_path, language='ko')
-        print("📝 STT 결과:", result["text"])
+    try:
+        await decoder.start()
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
 
-        # 5. 결과 전송
-        await websocket.send_json({
-            "transcript": result["text"]
-        })
+            if message.get("bytes"):
+                with stage("feed"):
+                    await decoder.feed(message["bytes"])
+            elif message.get("text"):
+                event = parse_event(message["text"])
+                if event is not None and event.get("event") == "end":
+                    break
 
-        os.remove(webm_path)
-        os.remove(wav_path)
+            # 이전 추론이 끝났을 때만 다음 윈도우를 시작해 추론이 수신을 막지 않게 한다
+            if (pending is None or pending.done()) and transcriber.needs_pass(decoder.audio()):
+                if pending is not None:
+                    pending.result()
+                pending = asyncio.create_task(send_partial())
 
+        # 1. 남은 청크 디코딩 마무리
+        with stage("flush"):
+            await decoder.close()
+            if pending is not None:
+                await pending
+
+        # 2. 확정되지 않은 마지막 윈도우만 추론해 최종 결과 전송
+        transcript = await transcriber.finalize(
+            decoder.audio(), on_queued=lambda p: send_queue_position(websocket, p))
+        print("📝 스트리밍 STT 결과:", transcript)
+        with stage("send"):
+            await websocket.send_json({
+                "transcript": transcript,
+                **verbal_feedback(transcript, decoder.duration),
+                **prosody_feedback(await analyze_prosody(decoder.audio(), text=transcript)),
+            })
+
+    except QueueFullError as e:
+        await send_busy(websocket, e)
+    except DecodeError as e:
+        print("❌ ffmpeg 스트리밍 디코딩 실패:", e)
+        await websocket.send_json(DECODE_FAILED)
+    except InferenceServerError as e:
+        print("❌ 추론 서버 오류:", e)
+        await websocket.send_json(INFERENCE_UNAVAILABLE)
     except WebSocketDisconnect:
-        print("🔌 WebSocket 연결 종료")
+        print("🔌 스트리밍 WebSocket 연결 종료")
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+        await decoder.abort()
@@ -0,0 +1,11 @@
+import json
+
+
+def parse_event(text):
+    """WebSocket 텍스트 메시지를 제어 이벤트로 읽는다. JSON 객체가 아니면 None (연결은 유지한다)."""
+    try:
+        event = json.loads(text)
+    except ValueError:
+        print("⚠️ 잘못된 제어 메시지:", text[:100])
+        return None
+    return event if isinstance(event, dict) else None
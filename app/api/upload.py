@@ -0,0 +1,329 @@
+import asyncio
+import fcntl
+import json
+import os
+import re
+import time
+import uuid
+from collections import deque
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Request
+
+from app.core import config
+from app.services import metrics
+from app.services.metrics import stage
+from app.services.decoder import SAMPLE_RATE, DecodeError, iter_audio, iter_frames, probe_media
+from app.services.inference import QueueFullError
+from app.services.batching import split_segments, merge_results
+from app.services.expression import analyzer, FAILED
+from app.services.nonverbal import NonverbalAggregator
+from app.services.prosody import ProsodyTracker, score_rows as prosody_rows
+from .audio import transcribe_audio, verbal_feedback
+
+router = APIRouter()
+
+# 끝난 작업은 결과 조회를 위해 이만큼만 남긴다
+MAX_FINISHED_JOBS = 100
+# 이 시간 동안 청크나 진행 상황 갱신이 없는 업로드/분석 작업은 버려진 것으로 보고 지운다
+STALE_JOB_SECONDS = 6 * 3600
+# 분석 중 진행 상황을 파일에 쓰는 최소 간격
+SAVE_INTERVAL = 1.0
+
+_UPLOAD_ID_RE = re.compile(r"[0-9a-f]{32}")
+EMPTY_TRANSCRIPT = {"text": "", "segments": [], "language": None}
+
+# 실행 중인 분석 작업 (참조를 잡아 두지 않으면 이벤트 루프가 작업을 회수할 수 있다)
+_tasks = set()
+
+
+class UploadJob:
+    """청크 업로드 하나와 그 영상의 오프라인 분석 진행 상황.
+
+    상태는 UPLOAD_DIR/<id>.json에 두므로 uvicorn 워커 여러 개 중 어느 워커가 요청을 받아도 같은 작업을 본다.
+    """
+
+    FIELDS = ("state", "received", "duration", "frames", "audio_seconds", "result", "error",
+              "updated_at", "finished_at")
+
+    def __init__(self, upload_id, **fields):
+        self.id = upload_id
+        self.path = os.path.join(config.UPLOAD_DIR, upload_id)
+        self.state = "uploading"
+        self.received = 0
+        self.duration = None
+        self.frames = 0
+        self.audio_seconds = 0.0
+        self.result = None
+        self.error = None
+        self.updated_at = time.time()
+        self.finished_at = None
+        self.__dict__.update(fields)
+        self._saved_at = 0.0
+
+    @property
+    def meta_path(self):
+        return self.path + ".json"
+
+    @classmethod
+    def load(cls, upload_id):
+        if not _UPLOAD_ID_RE.fullmatch(upload_id):
+            return None
+        try:
+            with open(os.path.join(config.UPLOAD_DIR, upload_id + ".json"), encoding="utf-8") as f:
+                return cls(upload_id, **json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def save(self):
+        # 다른 워커가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓰고 바꿔치기한다
+        self.updated_at = self._saved_at = time.time()
+        tmp = f"{self.meta_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({field: getattr(self, field) for field in self.FIELDS}, f, ensure_ascii=False)
+        os.replace(tmp, self.meta_path)
+
+    def touch(self):
+        # 분석 진행 상황은 SAVE_INTERVAL마다 한 번만 파일에 쓴다
+        if time.time() - self._saved_at >= SAVE_INTERVAL:
+            self.save()
+
+    def remove(self):
+        for path in (self.path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    @property
+    def progress(self):
+        if self.state == "done":
+            return 1.0
+        if self.state != "analyzing" or not self.duration:
+            return 0.0
+        # 프레임 분석과 오디오 전사 진행률의 평균 (둘은 동시에 진행된다)
+        frames = min(1.0, self.frames / max(1.0, self.duration * config.VIDEO_SAMPLE_FPS))
+        audio = min(1.0, self.audio_seconds / self.duration)
+        return round((frames + audio) / 2, 3)
+
+    def status(self):
+        return {
+            "upload_id": self.id,
+            "state": self.state,
+            "received": self.received,
+            "duration": self.duration,
+            "frames_analyzed": self.frames,
+            "audio_seconds": round(self.audio_seconds, 1),
+            "progress": self.progress,
+            "error": self.error,
+            "result": self.result,
+        }
+
+
+def _job(upload_id):
+    job = UploadJob.load(upload_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="upload not found")
+    return job
+
+
+def _lock(f):
+    # 같은 업로드에 대한 청크 쓰기/완료 처리는 워커와 상관없이 하나씩만 한다
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        raise HTTPException(status_code=409, detail="upload is busy") from None
+
+
+def _open_upload(job):
+    try:
+        return open(job.path, "r+b")
+    except FileNotFoundError:
+        raise HTTPException(status_code=409, detail=f"upload is {job.state}") from None
+
+
+def _prune():
+    now = time.time()
+    finished = []
+    for name in os.listdir(config.UPLOAD_DIR):
+        if not name.endswith(".json"):
+            continue
+        job = UploadJob.load(name[:-len(".json")])
+        if job is None:
+            continue
+        if job.finished_at:
+            finished.append(job)
+        elif now - job.updated_at > STALE_JOB_SECONDS:
+            # 업로드가 중단됐거나 분석하던 워커가 재시작되어 더 진행되지 않는 작업
+            print("🧹 방치된 업로드 삭제:", job.id, job.state)
+            job.remove()
+    finished.sort(key=lambda j: j.finished_at)
+    for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        job.remove()
+
+
+@router.post("/uploads")
+async def create_upload():
+    os.makedirs(config.UPLOAD_DIR, exist_ok=True)
+    _prune()
+    job = UploadJob(uuid.uuid4().hex)
+    open(job.path, "wb").close()
+    job.save()
+    return job.status()
+
+
+@router.put("/uploads/{upload_id}")
+async def upload_chunk(upload_id: str, request: Request, offset: int = 0):
+    # 청크 본문을 받는 대로 파일 끝에 이어 쓴다. offset이 맞지 않으면(재시도 등) 409와 현재 크기를 돌려준다
+    job = _job(upload_id)
+    with _open_upload(job) as f:
+        _lock(f)
+        job = _job(upload_id)
+        if job.state != "uploading":
+            raise HTTPException(status_code=409, detail=f"upload is {job.state}")
+        received = f.seek(0, os.SEEK_END)
+        if offset != received:
+            raise HTTPException(status_code=409, detail={"received": received})
+        async for chunk in request.stream():
+            if received + len(chunk) > config.UPLOAD_MAX_BYTES:
+                f.truncate(offset)
+                raise HTTPException(status_code=413, detail="upload too large")
+            await asyncio.to_thread(f.write, chunk)
+            received += len(chunk)
+        job.received = received
+        job.save()
+    return {"upload_id": upload_id, "received": job.received}
+
+
+@router.post("/uploads/{upload_id}/complete")
+async def complete_upload(upload_id: str):
+    job = _job(upload_id)
+    if job.state == "uploading":
+        with _open_upload(job) as f:
+            _lock(f)
+            job = _job(upload_id)
+            if job.state == "uploading":
+                job.state = "analyzing"
+                job.received = f.seek(0, os.SEEK_END)
+                job.save()
+                task = asyncio.create_task(analyze_video(job))
+                _tasks.add(task)
+                task.add_done_callback(_tasks.discard)
+    return job.status()
+
+
+@router.get("/uploads/{upload_id}")
+async def upload_status(upload_id: str):
+    return _job(upload_id).status()
+
+
+async def analyze_video(job: UploadJob):
+    print("🎞️ 영상 분석 시작:", job.id, job.received)
+    try:
+        async with metrics.request("video_upload", profile=False):
+            job.duration, has_audio = await probe_media(job.path)
+            # 프레임 분석과 오디오 추출/전사를 동시에 진행한다. 한쪽이 실패하면 다른 쪽도 멈춘다
+            tracker = ProsodyTracker()
+            frames = asyncio.create_task(_analyze_frames(job))
+            audio = asyncio.create_task(_transcribe(job, tracker) if has_audio else _no_audio())
+            try:
+                (rows, stats), transcript = await asyncio.gather(frames, audio)
+            except BaseException:
+                for task in (frames, audio):
+                    task.cancel()
+                await asyncio.gather(frames, audio, return_exceptions=True)
+                raise
+            speech = tracker.finish()
+        job.result = {
+            "transcript": transcript["text"],
+            "segments": transcript["segments"],
+            **verbal_feedback(transcript["text"], job.duration),
+            "nonverbal": rows + prosody_rows(speech),
+            "stats": stats,
+            "prosody": speech,
+        }
+        job.state = "done"
+        print("✅ 영상 분석 완료:", job.id)
+    except DecodeError as e:
+        print("❌ 영상 디코딩 실패:", e)
+        job.state, job.error = "failed", "ffmpeg 변환 실패"
+    except Exception as e:
+        print("❌ 영상 분석 실패:", e)
+        job.state, job.error = "failed", str(e)
+    finally:
+        job.finished_at = time.time()
+        if os.path.exists(job.path):
+            os.remove(job.path)
+        job.save()
+        _prune()
+
+
+async def _no_audio():
+    # 오디오 스트림이 없는 영상은 빈 전사로 보고 프레임 분석 결과만 낸다
+    print("🔇 오디오 스트림 없음")
+    return EMPTY_TRANSCRIPT
+
+
+async def _analyze_frames(job: UploadJob):
+    # 분석 중인 프레임 수를 제한해, 뒤처지면 ffmpeg 파이프가 차서 디코딩도 같이 멈추게 한다 (메모리 일정)
+    fps = config.VIDEO_SAMPLE_FPS
+    aggregator = NonverbalAggregator()
+    pending = deque()
+
+    async def consume():
+        timestamp, task = pending.popleft()
+        try:
+            result = await task
+        except Exception as e:
+            print("❌ 프레임 분석 실패:", e)
+            result = {"face": False, "expression": FAILED}
+        aggregator.update({**result, "timestamp": timestamp})
+        job.frames += 1
+        job.touch()
+
+    try:
+        with stage("frames"):
+            index = 0
+            async for frame in iter_frames(job.path, fps):
+                pending.append((index * 1000 / fps, asyncio.ensure_future(analyzer.analyze(frame))))
+                index += 1
+                if len(pending) >= analyzer.workers * 2:
+                    await consume()
+            while pending:
+                await consume()
+    finally:
+        for _, task in pending:
+            task.cancel()
+    return aggregator.finish()
+
+
+async def _transcribe(job: UploadJob, tracker: ProsodyTracker):
+    # VIDEO_AUDIO_CHUNK_SECONDS씩 읽어 조용한 지점에서 자르고, 잘린 뒷부분은 다음 청크 앞에 붙인다.
+    # 청크마다 전사가 끝나면 같은 버퍼로 운율 통계도 누적한다
+    parts = []
+    carry = np.empty(0, dtype=np.float32)
+    offset = 0.0
+
+    async def run(audio, offset):
+        while True:
+            try:
+                result = await transcribe_audio(audio)
+                break
+            except QueueFullError:
+                # 오프라인 작업이므로 실시간 세션에 자리를 양보하고 잠시 뒤 다시 시도한다
+                await asyncio.sleep(1.0)
+        parts.append((offset, result))
+        with stage("prosody"):
+            await asyncio.to_thread(tracker.add, audio, result["segments"])
+        job.audio_seconds = offset + len(audio) / SAMPLE_RATE
+        job.touch()
+
+    with stage("audio"):
+        async for chunk in iter_audio(job.path, config.VIDEO_AUDIO_CHUNK_SECONDS):
+            audio = np.concatenate([carry, chunk])
+            cut = int(round(split_segments(audio)[-1][0] * SAMPLE_RATE))
+            if cut:
+                await run(audio[:cut], offset)
+                offset += cut / SAMPLE_RATE
+            carry = audio[cut:]
+        if len(carry):
+            await run(carry, offset)
+    return merge_results(parts) if parts else EMPTY_TRANSCRIPT
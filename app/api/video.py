@@ -1,15 +1,45 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from app.services import metrics
+from app.services.expression import analyzer
+from app.services.nonverbal import NonverbalAggregator
+from .events import parse_event
+
 router = APIRouter()
 
+
+@router.get("/expression/status")
+async def expression_status():
+    return analyzer.stats()
+
+
 @router.websocket("/ws/expression")
 async def websocket_expression(websocket: WebSocket):
     await websocket.accept()
+    # 세션마다 프레임 분석 결과를 비언어 점수로 누적하고, {"event": "end"}를 받으면 답변 단위 점수를 보낸다
+    aggregator = NonverbalAggregator()
+
+    async def on_result(result):
+        aggregator.update(result)
+        await websocket.send_json(result)
+
     try:
-        while True:
-            data = await websocket.receive_bytes()
-            # 여기에 MediaPipe 등으로 표정 분석 처리
-            result = "😊 웃는 중"  # 예시 결과
-            await websocket.send_json({"expression": result})
+        # 프레임 수신과 분석을 분리해, 분석이 밀리면 오래된 프레임은 버리고 최신 프레임만 분석한다
+        async with metrics.request("expression", profile=False), analyzer.session(on_result) as session:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+
+                if message.get("bytes"):
+                    session.push(message["bytes"])
+                elif message.get("text"):
+                    event = parse_event(message["text"])
+                    if event is None or event.get("event") != "end":
+                        continue
+                    # 분석 중이던 프레임까지 이번 답변에 넣고 나서 점수를 낸다
+                    await session.drain()
+                    rows, stats = aggregator.finish()
+                    await websocket.send_json({"nonverbal": rows, "stats": stats})
     except WebSocketDisconnect:
-        print("🔌 표정 WebSocket 연결 종료")
\ No newline at end of file
+        print("🔌 표정 WebSocket 연결 종료")
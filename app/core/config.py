@@ -0,0 +1,68 @@
+import os
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+# Whisper 모델 크기/장치/정밀도 (WHISPER_FP16을 지정하지 않으면 CUDA에서만 fp16 사용)
+WHISPER_MODEL = os.environ.get("WHISPER_MODEL", "medium")
+WHISPER_DEVICE = os.environ.get("WHISPER_DEVICE") or None
+WHISPER_FP16 = _env_bool("WHISPER_FP16", None)
+WHISPER_LANGUAGE = os.environ.get("WHISPER_LANGUAGE", "ko")
+# 앱 시작 시 백그라운드에서 모델을 미리 로드하고 워밍업할지 여부 (끄면 첫 요청 때 로드)
+WHISPER_PRELOAD = _env_bool("WHISPER_PRELOAD", True)
+
+# ffmpeg 실행 파일 경로 (PATH에 없으면 절대 경로로 지정)
+FFMPEG_BIN = os.environ.get("FFMPEG_BIN", "ffmpeg")
+
+
+# 추론 워커 스레드 수와 대기열 길이 (대기열이 가득 차면 새 작업은 거절된다).
+# 추론은 모델 단위로 직렬화되므로 모델 하나로 서비스하는 동안 INFERENCE_WORKERS는 1로 고정된다
+INFERENCE_WORKERS = _env_int("INFERENCE_WORKERS", 1)
+INFERENCE_QUEUE_SIZE = _env_int("INFERENCE_QUEUE_SIZE", 8)
+
+# 여러 세션의 30초 세그먼트를 한 번에 추론하는 배치 크기와 최대 대기 시간 (1이면 배치 없이 transcribe 사용)
+WHISPER_BATCH_SIZE = _env_int("WHISPER_BATCH_SIZE", 8)
+WHISPER_BATCH_WAIT_MS = _env_int("WHISPER_BATCH_WAIT_MS", 50)
+
+# 같은 녹음의 재전송을 위한 전사 결과 캐시 (디렉터리를 지정하면 재시작 후에도 유지)
+TRANSCRIPT_CACHE_SIZE = _env_int("TRANSCRIPT_CACHE_SIZE", 256)
+TRANSCRIPT_CACHE_DIR = os.environ.get("TRANSCRIPT_CACHE_DIR") or None
+
+# Whisper 앞단에서 무음 구간을 잘라내는 VAD 사용 여부
+VAD_ENABLED = _env_bool("VAD_ENABLED", True)
+
+# 표정 분석 프로세스 풀 크기
+EXPRESSION_WORKERS = _env_int("EXPRESSION_WORKERS", 2)
+
+# 이 시간(ms)보다 오래 걸린 요청의 단계별 기록을 PROFILE_DIR에 남긴다 (0이면 끔).
+# PROFILE_CPROFILE을 켜면 cProfile 결과(.prof)도 함께 남긴다
+PROFILE_SLOW_MS = _env_int("PROFILE_SLOW_MS", 0)
+PROFILE_CPROFILE = _env_bool("PROFILE_CPROFILE", False)
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+
+# 면접 세션(/ws/transcript?mode=session) 하나가 동시에 처리할 수 있는 답변 수
+SESSION_MAX_INFLIGHT = _env_int("SESSION_MAX_INFLIGHT", 4)
+
+# 공유 추론 서버(python -m app.services.inference_server)의 Unix 소켓 경로.
+# 지정하면 웹 워커는 모델을 로드하지 않고 디코딩된 오디오를 이 서버로 보낸다.
+# INFERENCE_SHM을 켜면 오디오를 소켓 대신 공유 메모리로 넘긴다 (같은 호스트 전용)
+INFERENCE_SOCKET = os.environ.get("INFERENCE_SOCKET") or None
+INFERENCE_SHM = _env_bool("INFERENCE_SHM", False)
+
+# 영상 업로드(/uploads) 저장 위치(업로드 파일과 작업 상태 <id>.json, 워커 간 공유)와 최대 크기, 오프라인 분석 시 초당 샘플링할 프레임 수와 오디오 전사 단위
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "uploads")
+UPLOAD_MAX_BYTES = _env_int("UPLOAD_MAX_BYTES", 2 * 1024 ** 3)
+VIDEO_SAMPLE_FPS = float(os.environ.get("VIDEO_SAMPLE_FPS", 2))
+VIDEO_AUDIO_CHUNK_SECONDS = _env_int("VIDEO_AUDIO_CHUNK_SECONDS", 300)
+
+# 답변 용어 평가에 쓰는 용어집 (용어<TAB>표준 표기[<TAB>misuse])
+GLOSSARY_PATH = os.environ.get("GLOSSARY_PATH") or os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "glossary.tsv")
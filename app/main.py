@@ -1,9 +1,50 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.api import audio_router  # __init__.py에서 import된 router 사용
 from app.api import video_router
+from app.api import upload_router
+from app.core import config
+from app.services.registry import registry
+from app.services.expression import analyzer
+from app.services.inference_server import client as inference_client
+from app.services import metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 모델 로드/워밍업은 백그라운드에서 진행하고 서버는 바로 요청을 받기 시작한다
+    # (공유 추론 서버를 쓰면 모델은 그쪽에만 로드한다)
+    preload = config.WHISPER_PRELOAD and inference_client is None
+    task = asyncio.create_task(registry.preload()) if preload else None
+    yield
+    if task is not None:
+        task.cancel()
+    analyzer.shutdown()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 # WebSocket 라우터 포함
 app.include_router(audio_router)
-app.include_router(video_router)
\ No newline at end of file
+app.include_router(video_router)
+app.include_router(upload_router)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    # 모델 로드와 워밍업이 끝나야 200, 그 전에는 503
+    status = await inference_client.status() if inference_client is not None else registry.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,218 @@
+import asyncio
+import time
+
+import numpy as np
+
+from . import metrics
+from .decoder import SAMPLE_RATE
+from .inference import QueueFullError
+
+CHUNK_SECONDS = 30
+CHUNK_SAMPLES = CHUNK_SECONDS * SAMPLE_RATE
+# Whisper 타임스탬프 토큰 하나의 시간 간격 (conv stride 2 * hop 160 / 16kHz)
+TIME_PRECISION = 0.02
+
+BATCH_SIZE = metrics.Histogram(
+    "interview_inference_batch_size", "한 번에 추론한 세그먼트 수", buckets=(1, 2, 4, 8, 16, 32, 64))
+
+
+class BatchScheduler:
+    """여러 세션에서 동시에 들어온 30초 세그먼트를 모아 한 번의 배치 추론으로 처리한다.
+
+    배치가 실행되는 동안 들어온 세그먼트는 다음 배치로 모이므로
+    동시 접속이 늘수록 배치 크기도 자연스럽게 커진다.
+    """
+
+    def __init__(self, run_batch, max_batch_size, max_wait_ms, max_queue):
+        # run_batch: 세그먼트 리스트를 받아 같은 순서의 결과 리스트를 돌려주는 코루틴 함수
+        self._run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self._queue = None
+        self._task = None
+        self._busy = False
+        # 제출됐지만 아직 배치로 묶여 실행되지 않은 세그먼트 수
+        self.depth = 0
+        self.rejected = 0
+        self.batches = 0
+        self.segments = 0
+        self.audio_seconds = 0.0
+        self.busy_seconds = 0.0
+
+    async def submit(self, segment, on_queued=None):
+        return (await self.submit_many([segment], on_queued))[0]
+
+    async def submit_many(self, segments, on_queued=None):
+        # 한 요청의 세그먼트는 한꺼번에 받거나 한꺼번에 거절한다 (대기열이 비어 있으면 길어도 받는다)
+        if self.depth and self.depth + len(segments) > self.max_queue:
+            self.rejected += 1
+            raise QueueFullError(self.depth)
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._collect())
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for segment in segments:
+            future = loop.create_future()
+            self._queue.put_nowait((segment, future))
+            futures.append(future)
+        self.depth += len(segments)
+        if self._busy and on_queued is not None:
+            await on_queued(self._queue.qsize())
+        # 연결이 끊겨 취소되면 gather가 future들도 취소하므로 배치에서 빠진다
+        return await asyncio.gather(*futures)
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.depth -= len(batch)
+            # 기다리는 동안 연결이 끊겨 취소된 요청은 배치에서 뺀다
+            batch = [(segment, future) for segment, future in batch if not future.done()]
+            if batch:
+                await self._dispatch(batch)
+
+    async def _dispatch(self, batch):
+        self._busy = True
+        started = time.perf_counter()
+        try:
+            results = await self._run_batch([segment for segment, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._busy = False
+            self.busy_seconds += time.perf_counter() - started
+
+        BATCH_SIZE.observe(len(batch))
+        self.batches += 1
+        self.segments += len(batch)
+        self.audio_seconds += sum(len(segment) for segment, _ in batch) / SAMPLE_RATE
+        # 결과는 제출 순서대로 돌아오므로 각 요청(WebSocket)의 future에 그대로 돌려준다
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self.depth,
+            "queue_size": self.max_queue,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "segments": self.segments,
+            "avg_batch_size": self.segments / self.batches if self.batches else 0.0,
+            "audio_seconds_per_busy_second": self.audio_seconds / self.busy_seconds if self.busy_seconds else 0.0,
+        }
+
+
+def split_segments(audio, search_seconds=5):
+    """30초를 넘는 오디오를 각 청크 끝부분의 가장 조용한 지점에서 잘라 (offset초, 세그먼트) 목록으로 만든다."""
+    chunks = []
+    start = 0
+    search = search_seconds * SAMPLE_RATE
+    frame = SAMPLE_RATE // 100
+    while len(audio) - start > CHUNK_SAMPLES:
+        tail = audio[start + CHUNK_SAMPLES - search:start + CHUNK_SAMPLES]
+        energy = np.square(tail[:len(tail) // frame * frame].reshape(-1, frame)).mean(axis=1)
+        cut = start + CHUNK_SAMPLES - search + int(np.argmin(energy)) * frame
+        chunks.append((start / SAMPLE_RATE, audio[start:cut]))
+        start = cut
+    chunks.append((start / SAMPLE_RATE, audio[start:]))
+    return chunks
+
+
+def merge_results(parts):
+    segments = []
+    for offset, result in parts:
+        segments.extend(
+            {**s, "start": s["start"] + offset, "end": s["end"] + offset} for s in result["segments"]
+        )
+    return {
+        "text": "".join(s["text"] for s in segments),
+        "segments": segments,
+        "language": parts[0][1]["language"] if parts else None,
+    }
+
+
+def decode_batch(model, segments, language="ko", fp16=False, no_speech_threshold=0.6, logprob_threshold=-1.0,
+                 compression_ratio_threshold=2.4):
+    """30초 이하 세그먼트들을 mel 배치 하나로 묶어 Whisper encoder/decoder를 한 번만 돌린다.
+
+    한 번의 greedy 디코딩으로는 transcribe()와 같은 결과를 보장할 수 없는 세그먼트
+    (반복 루프, 낮은 확신도, 샘플 길이 한도에서 잘림)는 결과 자리에 None을 돌려준다.
+    """
+    import torch
+    import whisper
+    from whisper.tokenizer import get_tokenizer
+
+    mel = torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(segment), model.dims.n_mels)
+        for segment in segments
+    ]).to(model.device)
+    options = whisper.DecodingOptions(language=language, fp16=fp16)
+    results = whisper.decode(model, mel, options)
+    tokenizer = get_tokenizer(
+        model.is_multilingual, num_languages=model.num_languages, language=language, task="transcribe"
+    )
+
+    outputs = []
+    for segment, result in zip(segments, results):
+        # transcribe()와 같은 기준으로 무음 구간의 환각 결과를 버린다
+        silent = result.no_speech_prob > no_speech_threshold and result.avg_logprob < logprob_threshold
+        if not silent and _needs_fallback(tokenizer, result, logprob_threshold, compression_ratio_threshold):
+            outputs.append(None)
+            continue
+        parsed = [] if silent else _parse_segments(tokenizer, result.tokens, len(segment) / SAMPLE_RATE)
+        outputs.append({
+            "text": "".join(s["text"] for s in parsed),
+            "segments": parsed,
+            "language": result.language,
+        })
+    return outputs
+
+
+def _needs_fallback(tokenizer, result, logprob_threshold, compression_ratio_threshold):
+    # transcribe()가 temperature를 올려 다시 디코딩하는 조건과 같다
+    if result.compression_ratio > compression_ratio_threshold or result.avg_logprob < logprob_threshold:
+        return True
+    # 텍스트 토큰으로 끝났다면 샘플 길이 한도에서 잘린 것이다 (transcribe()는 마지막 타임스탬프부터 이어서 디코딩한다)
+    return bool(result.tokens) and result.tokens[-1] < tokenizer.timestamp_begin
+
+
+def _parse_segments(tokenizer, tokens, duration):
+    # <|0.00|> 텍스트 <|2.40|><|2.40|> 텍스트 <|5.00|> 형태의 토큰열을 세그먼트로 나눈다
+    segments = []
+    start = 0.0
+    text_tokens = []
+    for token in tokens:
+        if token >= tokenizer.timestamp_begin:
+            time_ = (token - tokenizer.timestamp_begin) * TIME_PRECISION
+            if text_tokens:
+                segments.append(_segment(tokenizer, start, time_, text_tokens))
+                text_tokens = []
+            start = time_
+        elif token < tokenizer.eot:
+            text_tokens.append(token)
+    if text_tokens:
+        segments.append(_segment(tokenizer, start, max(start, duration), text_tokens))
+    return segments
+
+
+def _segment(tokenizer, start, end, tokens):
+    return {"start": start, "end": end, "text": tokenizer.decode(tokens)}
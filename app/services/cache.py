@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+class TranscriptCache:
+    """WebM 바이트 해시 + 모델/언어 설정을 키로 하는 Whisper 전사 결과(+ 오디오 통계) 캐시.
+
+    메모리 LRU를 먼저 보고, disk_dir가 주어지면 재시작 후에도 남는 디스크 계층을 이어서 본다.
+    """
+
+    # 저장하는 값의 형식이 바뀌면 올려서 디스크에 남은 이전 형식 항목을 읽지 않게 한다
+    VERSION = 3
+
+    def __init__(self, max_entries, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @classmethod
+    def key(cls, data: bytes, model, language):
+        h = hashlib.sha256()
+        h.update(f"v{cls.VERSION}\0{model}\0{language}\0".encode())
+        h.update(data)
+        return h.hexdigest()
+
+    async def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        # 디스크 계층의 파일 읽기/JSON 파싱은 이벤트 루프 밖에서 한다
+        value = await asyncio.to_thread(self._read_disk, key) if self.disk_dir else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, value)
+            return value
+
+    async def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, value)
+
+    def _remember(self, key, value):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + ".json")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 쓰는 도중 종료되어도 깨진 파일이 남지 않도록 임시 파일에 쓴 뒤 교체한다
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "entries": size,
+            "max_entries": self.max_entries,
+            "disk": bool(self.disk_dir),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,204 @@
+import asyncio
+import re
+from contextlib import asynccontextmanager
+
+import numpy as np
+
+from app.core import config
+
+SAMPLE_RATE = 16000
+READ_SIZE = 64 * 1024
+
+FFMPEG_PCM_ARGS = [
+    "-f", "s16le", "-acodec", "pcm_s16le",
+    "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1",
+]
+
+
+DURATION_RE = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+AUDIO_STREAM_RE = re.compile(r"Stream #\d+:\d+.*: Audio:")
+JPEG_EOI = b"\xff\xd9"
+
+
+class DecodeError(RuntimeError):
+    pass
+
+
+async def decode_audio(data: bytes):
+    """WebM 바이트를 ffmpeg stdin/stdout 파이프로 디코딩해 float32 16kHz mono 배열로 돌려준다."""
+    proc = await asyncio.create_subprocess_exec(
+        config.FFMPEG_BIN, "-loglevel", "error", "-i", "pipe:0", *FFMPEG_PCM_ARGS,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        out, err = await proc.communicate(data)
+    except BaseException:
+        # 취소/연결 종료 시에도 ffmpeg 프로세스를 남기지 않는다
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    if proc.returncode != 0:
+        raise DecodeError(err.decode(errors="replace"))
+    return np.frombuffer(out, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+class StreamingDecoder:
+    """MediaRecorder 청크를 ffmpeg stdin으로 흘려보내고 16kHz mono PCM을 점진적으로 받아온다."""
+
+    def __init__(self):
+        self._proc = None
+        self._reader = None
+        self._pending = b""
+        self._length = 0
+        self._buffer = np.empty(SAMPLE_RATE * 30, dtype=np.float32)
+
+    async def start(self):
+        self._proc = await asyncio.create_subprocess_exec(
+            config.FFMPEG_BIN, "-loglevel", "error", "-i", "pipe:0", *FFMPEG_PCM_ARGS,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        self._reader = asyncio.create_task(self._read_stdout())
+
+    async def _read_stdout(self):
+        while True:
+            data = await self._proc.stdout.read(READ_SIZE)
+            if not data:
+                break
+            # s16le 샘플 경계(2바이트)가 청크 사이에서 잘릴 수 있으므로 나머지는 다음 청크로 넘긴다
+            data = self._pending + data
+            usable = len(data) - len(data) % 2
+            self._pending = data[usable:]
+            if usable:
+                self._append(np.frombuffer(data[:usable], dtype=np.int16))
+
+    def _append(self, samples):
+        end = self._length + len(samples)
+        if end > len(self._buffer):
+            # 용량을 두 배씩 늘려 긴 답변에서도 추가 비용이 분할 상환 O(1)이 되도록 한다
+            grown = np.empty(max(end, len(self._buffer) * 2), dtype=np.float32)
+            grown[:self._length] = self._buffer[:self._length]
+            self._buffer = grown
+        np.multiply(samples, 1 / 32768.0, out=self._buffer[self._length:end], casting="unsafe")
+        self._length = end
+
+    async def feed(self, chunk: bytes):
+        try:
+            self._proc.stdin.write(chunk)
+            await self._proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            raise DecodeError(await self._stderr())
+
+    async def close(self):
+        # stdin을 닫아 ffmpeg이 남은 프레임을 flush하게 한 뒤 종료를 기다린다
+        if self._proc.stdin and not self._proc.stdin.is_closing():
+            self._proc.stdin.close()
+        await self._reader
+        returncode = await self._proc.wait()
+        if returncode != 0:
+            raise DecodeError(await self._stderr())
+
+    async def abort(self):
+        if self._proc and self._proc.returncode is None:
+            self._proc.kill()
+            await self._proc.wait()
+        if self._reader:
+            self._reader.cancel()
+
+    async def _stderr(self):
+        if self._proc.returncode is None:
+            self._proc.kill()
+        err = await self._proc.stderr.read()
+        return err.decode(errors="replace")
+
+    @property
+    def duration(self):
+        return self._length / SAMPLE_RATE
+
+    def audio(self):
+        # 복사 없이 지금까지 디코딩된 구간의 view를 돌려준다
+        return self._buffer[:self._length]
+
+
+@asynccontextmanager
+async def _ffmpeg(*args):
+    proc = await asyncio.create_subprocess_exec(
+        config.FFMPEG_BIN, "-loglevel", "error", *args,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        yield proc
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+
+
+async def _check_exit(proc):
+    if await proc.wait() != 0:
+        err = await proc.stderr.read()
+        raise DecodeError(err.decode(errors="replace"))
+
+
+async def probe_media(path):
+    """ffmpeg 스트림 정보에서 (길이초, 오디오 스트림 여부)를 읽는다.
+
+    컨테이너에 길이가 기록되어 있지 않으면(MediaRecorder WebM 등) 길이는 None이다.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        config.FFMPEG_BIN, "-hide_banner", "-i", path,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, err = await proc.communicate()
+    info = err.decode(errors="replace")
+    has_audio = AUDIO_STREAM_RE.search(info) is not None
+    match = DURATION_RE.search(info)
+    if match is None:
+        return None, has_audio
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds), has_audio
+
+
+async def iter_audio(path, chunk_seconds):
+    """파일의 오디오를 16kHz mono float32로 디코딩해 chunk_seconds 단위로 내보낸다 (전체를 메모리에 올리지 않는다)."""
+    chunk_bytes = int(chunk_seconds * SAMPLE_RATE) * 2
+    async with _ffmpeg("-i", path, "-vn", *FFMPEG_PCM_ARGS) as proc:
+        while True:
+            try:
+                data = await proc.stdout.readexactly(chunk_bytes)
+            except asyncio.IncompleteReadError as e:
+                data = e.partial[:len(e.partial) - len(e.partial) % 2]
+            if data:
+                yield np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+            if len(data) < chunk_bytes:
+                break
+        await _check_exit(proc)
+
+
+async def iter_frames(path, fps, max_width=640):
+    """파일에서 초당 fps장씩 프레임을 뽑아 JPEG 바이트로 내보낸다. 읽지 않으면 파이프가 차서 ffmpeg도 멈춘다."""
+    video_filter = f"fps={fps},scale='min({max_width},iw)':-2"
+    async with _ffmpeg("-i", path, "-an", "-vf", video_filter,
+                       "-f", "image2pipe", "-c:v", "mjpeg", "-q:v", "3", "pipe:1") as proc:
+        buffer = b""
+        while True:
+            data = await proc.stdout.read(READ_SIZE)
+            if not data:
+                break
+            buffer += data
+            # mjpeg 스트림은 프레임마다 EOI(FFD9)로 끝나고, 엔트로피 구간의 FF는 FF00으로 이스케이프된다
+            while True:
+                end = buffer.find(JPEG_EOI)
+                if end < 0:
+                    break
+                yield buffer[:end + 2]
+                buffer = buffer[end + 2:]
+        await _check_exit(proc)
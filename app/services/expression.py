@@ -0,0 +1,242 @@
+import asyncio
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from app.core import config
+from . import metrics
+from .metrics import stage
+
+# MediaPipe FaceMesh(refine_landmarks=True) 랜드마크 인덱스
+MOUTH_LEFT, MOUTH_RIGHT, LIP_TOP, LIP_BOTTOM = 61, 291, 13, 14
+FACE_LEFT, FACE_RIGHT, NOSE_TIP = 234, 454, 1
+LEFT_EYE = (33, 133, 159, 145)   # 바깥 끝, 안쪽 끝, 위, 아래
+RIGHT_EYE = (362, 263, 386, 374)
+LEFT_IRIS, RIGHT_IRIS = 468, 473
+
+NO_FACE = "🙈 얼굴 없음"
+UNAVAILABLE = "분석 불가"
+FAILED = "분석 실패"
+
+FRAME_LATENCY = metrics.Histogram("interview_frame_latency_seconds", "프레임 수신부터 결과 전송까지 걸린 시간")
+
+_face_mesh = None
+
+
+def _init_worker():
+    # 프로세스마다 FaceMesh를 한 번만 만든다 (mediapipe가 없으면 분석 불가로 응답).
+    # 워커 하나가 여러 세션과 /uploads의 프레임을 섞어 받으므로 프레임 간 추적 없이 매 프레임 새로 검출한다
+    global _face_mesh
+    try:
+        import mediapipe as mp
+    except ImportError:
+        print("⚠️ mediapipe가 설치되어 있지 않아 표정 분석을 건너뜁니다")
+        return
+    _face_mesh = mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=True, max_num_faces=1, refine_landmarks=True
+    )
+
+
+def decode_frame(data: bytes):
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def analyze_frame(data: bytes):
+    """JPEG/WebP 프레임 하나를 디코딩해 표정/시선/눈 깜빡임/머리 위치 특징을 뽑는다 (워커 프로세스에서 실행)."""
+    if _face_mesh is None:
+        return {"face": False, "expression": UNAVAILABLE}
+
+    frame = decode_frame(data)
+    found = _face_mesh.process(frame).multi_face_landmarks
+    if not found:
+        return {"face": False, "expression": NO_FACE}
+
+    points = np.array([(p.x, p.y) for p in found[0].landmark], dtype=np.float32)
+    return face_features(points)
+
+
+def face_features(points):
+    face_width = np.linalg.norm(points[FACE_RIGHT] - points[FACE_LEFT]) + 1e-6
+    smile = float(np.linalg.norm(points[MOUTH_RIGHT] - points[MOUTH_LEFT]) / face_width)
+    mouth_open = float(np.linalg.norm(points[LIP_BOTTOM] - points[LIP_TOP]) / face_width)
+
+    # 눈 안에서 홍채가 가운데 근처에 있으면 화면(면접관)을 보고 있다고 본다
+    gaze = np.mean([_iris_position(points, LEFT_EYE, LEFT_IRIS),
+                    _iris_position(points, RIGHT_EYE, RIGHT_IRIS)], axis=0)
+    eye_open = float(np.mean([_eye_aspect(points, LEFT_EYE), _eye_aspect(points, RIGHT_EYE)]))
+
+    if mouth_open > 0.12:
+        expression = "😮 놀람"
+    elif smile > 0.42:
+        expression = "😊 웃는 중"
+    else:
+        expression = "😐 무표정"
+
+    return {
+        "face": True,
+        "expression": expression,
+        "smile": round(smile, 3),
+        "mouth_open": round(mouth_open, 3),
+        "gaze": [round(float(gaze[0]), 3), round(float(gaze[1]), 3)],
+        "gaze_on_target": bool(abs(gaze[0] - 0.5) < 0.15 and abs(gaze[1] - 0.5) < 0.25),
+        "eye_open": round(eye_open, 3),
+        "head": [round(float(points[NOSE_TIP][0]), 4), round(float(points[NOSE_TIP][1]), 4)],
+    }
+
+
+def _iris_position(points, eye, iris):
+    outer, inner, top, bottom = (points[i] for i in eye)
+    x = (points[iris][0] - min(outer[0], inner[0])) / (abs(inner[0] - outer[0]) + 1e-6)
+    y = (points[iris][1] - top[1]) / (abs(bottom[1] - top[1]) + 1e-6)
+    return np.array([x, y])
+
+
+def _eye_aspect(points, eye):
+    outer, inner, top, bottom = (points[i] for i in eye)
+    return np.linalg.norm(bottom - top) / (np.linalg.norm(inner - outer) + 1e-6)
+
+
+class FrameAnalyzer:
+    """프로세스 풀에서 프레임을 분석한다. 세션별로 가장 최신 프레임만 분석하고 밀린 프레임은 버린다."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._pool = None
+        self.received = 0
+        self.analyzed = 0
+        self.dropped = 0
+        self.sessions = 0
+
+    def _executor(self):
+        # 프로세스는 첫 프레임이 들어올 때 띄워 앱 import/시작을 가볍게 유지한다.
+        # fork로 띄우면 그 시점에 열려 있던 WebSocket 소켓 fd를 자식이 물려받아 연결 종료가 늦어지므로 spawn을 쓴다
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return self._pool
+
+    async def analyze(self, data: bytes):
+        loop = asyncio.get_running_loop()
+        # 워커가 죽으면(mediapipe 네이티브 크래시 등) 풀 전체를 못 쓰게 되므로 풀을 새로 만들고 이 프레임을 한 번만 다시 시도한다
+        for attempt in range(2):
+            pool = self._executor()
+            try:
+                result = await loop.run_in_executor(pool, analyze_frame, data)
+                break
+            except BrokenProcessPool:
+                print("⚠️ 표정 분석 워커가 종료되어 프로세스 풀을 다시 만듭니다")
+                self._reset(pool)
+                if attempt:
+                    raise
+        self.analyzed += 1
+        return result
+
+    def _reset(self, pool):
+        # 동시에 실패한 다른 요청이 이미 새로 만든 풀은 버리지 않는다
+        if self._pool is pool:
+            self._pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def session(self, send):
+        return FrameSession(self, send)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "sessions": self.sessions,
+            "received": self.received,
+            "analyzed": self.analyzed,
+            "dropped": self.dropped,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+class FrameSession:
+    """세션당 최신 프레임 슬롯 하나. 분석 중에 들어온 프레임은 슬롯을 덮어써 지연이 쌓이지 않는다."""
+
+    def __init__(self, analyzer, send):
+        self._analyzer = analyzer
+        self._send = send
+        self._latest = None
+        self._event = asyncio.Event()
+        self._seq = 0
+        self._task = None
+        # 슬롯이 비어 있고 분석 중인 프레임도 없을 때 set
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def __aenter__(self):
+        self._analyzer.sessions += 1
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc):
+        self._analyzer.sessions -= 1
+        self._task.cancel()
+        try:
+            await self._task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+    def push(self, data: bytes, timestamp=None):
+        self._seq += 1
+        self._analyzer.received += 1
+        if self._latest is not None:
+            self._analyzer.dropped += 1
+        self._latest = (self._seq, timestamp if timestamp is not None else time.time() * 1000, time.perf_counter(), data)
+        self._idle.clear()
+        self._event.set()
+
+    async def drain(self):
+        # 이미 받은 프레임(분석 중인 것 포함)의 결과를 모두 보낼 때까지 기다린다
+        waiter = asyncio.ensure_future(self._idle.wait())
+        try:
+            await asyncio.wait((waiter, self._task), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+
+    async def _run(self):
+        while True:
+            await self._event.wait()
+            self._event.clear()
+            seq, timestamp, received_at, data = self._latest
+            self._latest = None
+            try:
+                with stage("analyze"):
+                    result = await self._analyzer.analyze(data)
+            except Exception as e:
+                # 깨진 프레임 하나 때문에 세션 전체가 멈추지 않도록 실패 결과만 보내고 계속한다
+                print("❌ 프레임 분석 실패:", e)
+                result = {"face": False, "expression": FAILED}
+            latency = time.perf_counter() - received_at
+            FRAME_LATENCY.observe(latency)
+            with stage("send"):
+                await self._send({
+                    **result,
+                    "frame": seq,
+                    "timestamp": timestamp,
+                    "latency_ms": round(latency * 1000, 1),
+                })
+            if self._latest is None:
+                self._idle.set()
+
+
+analyzer = FrameAnalyzer(config.EXPRESSION_WORKERS)
+
+metrics.Counter("interview_frames_received_total", "수신한 프레임 수", fn=lambda: analyzer.received)
+metrics.Counter("interview_frames_analyzed_total", "분석한 프레임 수", fn=lambda: analyzer.analyzed)
+metrics.Counter("interview_frames_dropped_total", "최신 프레임에 밀려 버린 프레임 수", fn=lambda: analyzer.dropped)
@@ -0,0 +1,93 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from app.core import config
+from . import metrics
+
+WAIT_SECONDS = metrics.Histogram("interview_inference_wait_seconds", "추론 작업이 대기열에서 기다린 시간")
+RUN_SECONDS = metrics.Histogram("interview_inference_run_seconds", "추론 작업 실행 시간")
+
+
+class QueueFullError(RuntimeError):
+    def __init__(self, depth):
+        super().__init__(f"inference queue is full ({depth} waiting)")
+        self.depth = depth
+
+
+class InferenceExecutor:
+    """이벤트 루프 밖에서 추론을 실행하는 워커 풀. 대기열이 가득 차면 즉시 거절한다."""
+
+    def __init__(self, workers, max_queue):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        # 실행 중 + 대기 중 작업 수 (이벤트 루프 스레드에서만 갱신)
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def depth(self):
+        return max(0, self._pending - self.workers)
+
+    @property
+    def running(self):
+        return min(self._pending, self.workers)
+
+    async def run(self, fn, *args, on_queued=None, **kwargs):
+        if self.depth >= self.max_queue:
+            self.rejected += 1
+            raise QueueFullError(self.depth)
+
+        loop = asyncio.get_running_loop()
+        position = self._pending - self.workers + 1
+        self._pending += 1
+        future = self._pool.submit(_timed, partial(fn, *args, **kwargs), time.perf_counter())
+        # 대기 중 취소되든 실행이 끝나든 워커가 실제로 비었을 때만 카운터를 줄인다
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+
+        try:
+            if position > 0 and on_queued is not None:
+                await on_queued(position)
+        except BaseException:
+            future.cancel()
+            raise
+        return await asyncio.wrap_future(future)
+
+    def _release(self):
+        self._pending -= 1
+        self.completed += 1
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queue_depth": self.depth,
+            "queue_size": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _timed(job, submitted):
+    started = time.perf_counter()
+    WAIT_SECONDS.observe(started - submitted)
+    try:
+        return job()
+    finally:
+        RUN_SECONDS.observe(time.perf_counter() - started)
+
+
+# 추론은 모델 단위로 직렬화되므로(ModelEntry.lock) 모델을 하나만 쓰는 지금은 워커를 늘려도 한 번에 한 작업만 돈다.
+# 늘린 워커가 실행 중으로 잡혀 대기열 길이와 순번이 틀어지지 않도록 워커 수는 1로 고정한다
+if config.INFERENCE_WORKERS > 1:
+    print(f"⚠️ INFERENCE_WORKERS={config.INFERENCE_WORKERS}는 모델 하나로는 효과가 없어 1로 실행합니다")
+executor = InferenceExecutor(1, config.INFERENCE_QUEUE_SIZE)
+
+metrics.Gauge("interview_inference_running", "실행 중인 추론 작업 수", fn=lambda: executor.running)
+metrics.Gauge("interview_inference_queue_size", "추론 대기열 최대 길이", fn=lambda: executor.max_queue)
@@ -0,0 +1,197 @@
+"""여러 uvicorn 워커가 Whisper 모델 하나를 공유하도록 추론만 전담하는 로컬 서버.
+
+    INFERENCE_SOCKET=/tmp/interview-inference.sock python -m app.services.inference_server
+    INFERENCE_SOCKET=/tmp/interview-inference.sock uvicorn app.main:app --workers 4
+
+메시지는 [4바이트 헤더 길이][JSON 헤더][본문] 형식이다. 요청 본문은 16kHz float32 PCM이고,
+INFERENCE_SHM을 켜면 본문 대신 공유 메모리 이름만 보낸다. 서버는 대기 중이면
+{"queue_position": n}을, 마지막에 {"result": ...} 또는 {"error": "busy", "queue_depth": n}을 보낸다.
+"""
+import asyncio
+import json
+import os
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from app.core import config
+from .inference import QueueFullError
+from .registry import registry
+from . import transcriber
+
+_HEADER = struct.Struct(">I")
+
+
+class InferenceServerError(RuntimeError):
+    pass
+
+
+async def read_message(reader):
+    size = _HEADER.unpack(await reader.readexactly(_HEADER.size))[0]
+    header = json.loads(await reader.readexactly(size))
+    payload = await reader.readexactly(header["nbytes"]) if header.get("nbytes") else b""
+    return header, payload
+
+
+async def write_message(writer, header, payload=b""):
+    if payload:
+        header = {**header, "nbytes": len(payload)}
+    data = json.dumps(header, ensure_ascii=False, default=_json_default).encode()
+    writer.write(_HEADER.pack(len(data)) + data)
+    if payload:
+        writer.write(payload)
+    await writer.drain()
+
+
+def _json_default(value):
+    # numpy 스칼라(float32 등)가 결과에 섞여 있어도 직렬화한다
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class InferenceClient:
+    """웹 워커 쪽 클라이언트. 요청마다 Unix 소켓 연결을 하나 열고 결과를 받으면 닫는다."""
+
+    def __init__(self, path, use_shm=False):
+        self.path = path
+        self.use_shm = use_shm
+
+    async def transcribe(self, audio, on_queued=None):
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        shm = None
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.path)
+        except OSError as e:
+            raise InferenceServerError(f"inference server unavailable: {e}") from e
+        try:
+            if self.use_shm and audio.nbytes:
+                # 서버가 같은 메모리를 그대로 읽으므로 소켓으로 오디오를 복사하지 않는다
+                shm = shared_memory.SharedMemory(create=True, size=audio.nbytes)
+                np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+                await write_message(writer, {"op": "transcribe", "shm": shm.name, "samples": len(audio)})
+            else:
+                await write_message(writer, {"op": "transcribe"}, audio.tobytes())
+
+            while True:
+                header, _ = await read_message(reader)
+                if "queue_position" in header:
+                    if on_queued is not None:
+                        await on_queued(header["queue_position"])
+                elif header.get("error") == "busy":
+                    raise QueueFullError(header["queue_depth"])
+                elif "error" in header:
+                    raise InferenceServerError(header["error"])
+                else:
+                    return header["result"]
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            raise InferenceServerError("inference server closed the connection") from e
+        finally:
+            writer.close()
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+    async def status(self):
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.path)
+        except OSError as e:
+            return {"ready": False, "error": f"inference server unavailable: {e}"}
+        try:
+            await write_message(writer, {"op": "status"})
+            header, _ = await read_message(reader)
+            return header
+        finally:
+            writer.close()
+
+
+class InferenceServer:
+    def __init__(self, path):
+        self.path = path
+        self.requests = 0
+
+    async def handle(self, reader, writer):
+        try:
+            header, payload = await read_message(reader)
+            if header.get("op") == "status":
+                await write_message(writer, self.status())
+            elif header.get("op") == "transcribe":
+                await self._transcribe(header, payload, reader, writer)
+            else:
+                await write_message(writer, {"error": f"unknown op: {header.get('op')}"})
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _transcribe(self, header, payload, reader, writer):
+        self.requests += 1
+        shm = None
+        if "shm" in header:
+            shm = shared_memory.SharedMemory(name=header["shm"])
+            # 공유 메모리의 소유자(unlink 책임)는 클라이언트이므로 이 프로세스의 추적 목록에서는 뺀다
+            resource_tracker.unregister(shm._name, "shared_memory")
+            audio = np.ndarray((header["samples"],), dtype=np.float32, buffer=shm.buf)
+        else:
+            audio = np.frombuffer(payload, dtype=np.float32)
+
+        async def on_queued(position):
+            await write_message(writer, {"queue_position": position})
+
+        # 웹 워커가 먼저 연결을 끊으면(사용자 이탈) 아직 대기 중인 추론을 취소한다
+        job = asyncio.create_task(transcriber.transcribe_local(audio, on_queued=on_queued))
+        hangup = asyncio.create_task(reader.read(1))
+        try:
+            await asyncio.wait({job, hangup}, return_when=asyncio.FIRST_COMPLETED)
+            if not job.done():
+                job.cancel()
+                return
+            try:
+                result = job.result()
+            except QueueFullError as e:
+                await write_message(writer, {"error": "busy", "queue_depth": e.depth})
+            except Exception as e:
+                print("❌ 추론 실패:", e)
+                await write_message(writer, {"error": str(e)})
+            else:
+                await write_message(writer, {"result": result})
+        finally:
+            hangup.cancel()
+            del audio
+            if shm is not None:
+                try:
+                    shm.close()
+                except BufferError:
+                    # 취소된 작업이 아직 버퍼를 참조하고 있으면 GC에 맡긴다
+                    pass
+
+    def status(self):
+        return {**registry.status(), "requests": self.requests, "inference": transcriber.stats()}
+
+    async def serve(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self.handle, path=self.path)
+        print(f"🧠 추론 서버 시작: {self.path}")
+        # 연결은 바로 받되 ready 여부는 status로 알린다 (웹 워커의 /ready가 이 값을 그대로 보여준다)
+        preload = asyncio.create_task(registry.preload())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            preload.cancel()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+client = InferenceClient(config.INFERENCE_SOCKET, config.INFERENCE_SHM) if config.INFERENCE_SOCKET else None
+
+
+if __name__ == "__main__":
+    if not config.INFERENCE_SOCKET:
+        raise SystemExit("INFERENCE_SOCKET 환경 변수로 소켓 경로를 지정하세요.")
+    try:
+        asyncio.run(InferenceServer(config.INFERENCE_SOCKET).serve())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,195 @@
+import bisect
+import contextvars
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from app.core import config
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_metrics = []
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labelnames=(), fn=None):
+        # fn을 주면 스크레이프 시점에 값을 읽어오는 콜백 지표가 된다 (라벨 없음)
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.fn = fn
+        self._values = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def _labels(self, labelvalues):
+        if not labelvalues:
+            return ""
+        pairs = ",".join(f'{k}="{v}"' for k, v in zip(self.labelnames, labelvalues))
+        return "{" + pairs + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        if self.fn is not None:
+            lines.append(f"{self.name} {float(self.fn())}")
+            return lines
+        with self._lock:
+            items = list(self._values.items())
+        lines.extend(f"{self.name}{self._labels(labels)} {value}" for labels, value in items)
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, *labelvalues, amount=1):
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labelvalues):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                # 버킷별 개수(마지막은 +Inf), 합계
+                state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][i] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, *labelvalues):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labelvalues)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = [(labels, (list(counts), total)) for labels, (counts, total) in self._values.items()]
+        for labels, (counts, total) in items:
+            base = self._labels(labels)[1:-1]
+            sep = "," if base else ""
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {cumulative}')
+            suffix = "{" + base + "}" if base else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+def render():
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = Histogram(
+    "interview_stage_seconds", "WebSocket 핸들러 단계별 소요 시간", ("endpoint", "stage"))
+REQUEST_SECONDS = Histogram(
+    "interview_request_seconds", "WebSocket 요청(세션) 전체 소요 시간", ("endpoint",))
+ACTIVE_SESSIONS = Gauge(
+    "interview_active_sessions", "현재 열려 있는 WebSocket 세션 수", ("endpoint",))
+SLOW_REQUESTS = Counter(
+    "interview_slow_requests_total", "프로파일 임계값을 넘은 요청 수", ("endpoint",))
+
+_current = contextvars.ContextVar("request_trace", default=None)
+_profiler_lock = threading.Lock()
+
+
+class RequestTrace:
+    """요청 하나의 단계별 시간을 기록한다. 프로파일 훅이 꺼져 있으면 히스토그램만 갱신한다."""
+
+    def __init__(self, endpoint, profile=True):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.stages = [] if profile and config.PROFILE_SLOW_MS > 0 else None
+        self.profiler = None
+
+    def record(self, name, seconds):
+        STAGE_SECONDS.observe(seconds, self.endpoint, name)
+        if self.stages is not None:
+            self.stages.append((name, round(seconds * 1000, 2)))
+
+
+@contextmanager
+def stage(name):
+    # 현재 요청의 trace(contextvar)에 단계 시간을 기록한다. 요청 밖에서 불리면 endpoint는 "background"
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        trace = _current.get()
+        if trace is not None:
+            trace.record(name, elapsed)
+        else:
+            STAGE_SECONDS.observe(elapsed, "background", name)
+
+
+@asynccontextmanager
+async def request(endpoint, profile=True):
+    # 세션 길이가 사용자 행동에 좌우되는 연결(스트리밍, 표정)은 profile=False로 느린 요청 기록에서 뺀다
+    trace = RequestTrace(endpoint, profile)
+    token = _current.set(trace)
+    ACTIVE_SESSIONS.inc(endpoint)
+    # cProfile은 스레드당 하나만 켤 수 있으므로 동시에 한 요청만 프로파일한다
+    if config.PROFILE_CPROFILE and trace.stages is not None and _profiler_lock.acquire(blocking=False):
+        trace.profiler = cProfile.Profile()
+        trace.profiler.enable()
+    try:
+        yield trace
+    finally:
+        elapsed = time.perf_counter() - trace.started
+        if trace.profiler is not None:
+            trace.profiler.disable()
+            _profiler_lock.release()
+        ACTIVE_SESSIONS.dec(endpoint)
+        REQUEST_SECONDS.observe(elapsed, endpoint)
+        _current.reset(token)
+        if trace.stages is not None and elapsed * 1000 >= config.PROFILE_SLOW_MS:
+            _dump_slow(trace, elapsed)
+
+
+def _dump_slow(trace, elapsed):
+    SLOW_REQUESTS.inc(trace.endpoint)
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{trace.endpoint}-{int(elapsed * 1000)}ms"
+    path = os.path.join(config.PROFILE_DIR, name)
+    with open(path + ".json", "w", encoding="utf-8") as f:
+        json.dump({"endpoint": trace.endpoint, "total_ms": round(elapsed * 1000, 2), "stages": trace.stages}, f)
+    if trace.profiler is not None:
+        trace.profiler.dump_stats(path + ".prof")
+    print(f"🐢 느린 요청 기록: {path} ({elapsed * 1000:.0f}ms)")
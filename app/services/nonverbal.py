@@ -0,0 +1,147 @@
+from collections import Counter
+
+import numpy as np
+
+FEATURES = ("timestamp", "gaze_on", "eye_open", "head_x", "head_y", "smile")
+COLUMNS = {name: i for i, name in enumerate(FEATURES)}
+
+
+class RingBuffer:
+    """고정 크기 NumPy 링 버퍼. 가득 차면 가장 오래된 행을 덮어쓰고 그 행을 돌려준다."""
+
+    def __init__(self, capacity, width):
+        self._data = np.zeros((capacity, width), dtype=np.float64)
+        self._next = 0
+        self.count = 0
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    def push(self, row):
+        evicted = self._data[self._next].copy() if self.count == self.capacity else None
+        self._data[self._next] = row
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return evicted
+
+    def clear(self):
+        self._next = 0
+        self.count = 0
+
+
+class NonverbalAggregator:
+    """프레임별 표정/시선 분석 결과를 세션 단위 비언어 점수로 누적한다.
+
+    프레임마다 O(1)로 누적 통계를 갱신하고, 최근 프레임은 고정 크기 링 버퍼에만 보관하므로
+    면접이 길어져도 세션당 메모리는 일정하다.
+    """
+
+    def __init__(self, window=300, blink_threshold=0.18):
+        self.recent = RingBuffer(window, len(FEATURES))
+        self.blink_threshold = blink_threshold
+        self.reset()
+
+    def reset(self):
+        self.recent.clear()
+        self._recent_sum = np.zeros(len(FEATURES))
+        self.frames = 0
+        self.face_frames = 0
+        self.gaze_on = 0
+        self.blinks = 0
+        self.movement = 0.0
+        self.expressions = Counter()
+        self.first_ts = None
+        self.last_ts = None
+        self._prev = None
+
+    def update(self, result):
+        timestamp = result.get("timestamp", 0.0)
+        if self.first_ts is None:
+            self.first_ts = timestamp
+        self.last_ts = timestamp
+        self.frames += 1
+        self.expressions[result.get("expression")] += 1
+        if not result.get("face"):
+            return
+
+        row = np.array([
+            timestamp,
+            float(result["gaze_on_target"]),
+            result["eye_open"],
+            result["head"][0],
+            result["head"][1],
+            result["smile"],
+        ])
+        self.face_frames += 1
+        self.gaze_on += int(row[1])
+
+        if self._prev is not None:
+            # 눈이 떠 있다가 임계값 아래로 내려가는 순간을 깜빡임 한 번으로 센다
+            if row[2] < self.blink_threshold <= self._prev[2]:
+                self.blinks += 1
+            self.movement += float(np.hypot(*(row[3:5] - self._prev[3:5])))
+        self._prev = row
+
+        evicted = self.recent.push(row)
+        self._recent_sum += row
+        if evicted is not None:
+            self._recent_sum -= evicted
+
+    def snapshot(self):
+        minutes = max((self.last_ts or 0) - (self.first_ts or 0), 1.0) / 60000
+        recent = self.recent.count
+        return {
+            "frames": self.frames,
+            "face_ratio": self.face_frames / self.frames if self.frames else 0.0,
+            "gaze_ratio": self.gaze_on / self.face_frames if self.face_frames else 0.0,
+            "recent_gaze_ratio": float(self._recent_sum[COLUMNS["gaze_on"]] / recent) if recent else 0.0,
+            "expressions": {k: v / self.frames for k, v in self.expressions.items()} if self.frames else {},
+            "blinks_per_minute": self.blinks / minutes,
+            "movement_per_second": self.movement / (minutes * 60),
+        }
+
+    def finish(self):
+        # 답변 하나가 끝나면 점수 행을 만들고 다음 답변을 위해 초기화한다
+        stats = self.snapshot()
+        rows = score_rows(stats)
+        self.reset()
+        return rows, stats
+
+
+def score_rows(stats):
+    if not stats["frames"] or not stats["face_ratio"]:
+        return [("시선 처리", 0, "얼굴이 인식되지 않아 비언어 표현을 평가하지 못했습니다.")]
+
+    gaze = stats["gaze_ratio"] * stats["face_ratio"]
+    gaze_score = round(100 * gaze) - (10 if stats["blinks_per_minute"] > 35 else 0)
+    if gaze >= 0.8:
+        gaze_feedback = "면접관과의 시선 접촉이 자연스럽고 안정적이었습니다."
+    elif gaze >= 0.6:
+        gaze_feedback = "시선을 대체로 유지했지만 종종 화면을 벗어났습니다."
+    else:
+        gaze_feedback = "눈을 자주 피하는 경향이 있었습니다."
+    if stats["blinks_per_minute"] > 35:
+        gaze_feedback += " 눈 깜빡임이 잦아 긴장한 인상을 주었습니다."
+
+    smile = stats["expressions"].get("😊 웃는 중", 0.0)
+    expression_score = round(60 + 40 * min(1.0, smile / 0.3))
+    if smile >= 0.3:
+        expression_feedback = "밝은 표정으로 긍정적인 인상을 주었습니다."
+    elif smile >= 0.1:
+        expression_feedback = "표정이 무난했으나 조금 더 밝은 표정이면 좋겠습니다."
+    else:
+        expression_feedback = "표정 변화가 적어 다소 경직된 인상을 주었습니다."
+
+    movement = stats["movement_per_second"]
+    posture_score = int(np.clip(round(100 - 1000 * max(0.0, movement - 0.01)), 40, 100))
+    if movement <= 0.02:
+        posture_feedback = "자세가 안정적으로 유지되었습니다."
+    else:
+        posture_feedback = "머리 움직임이 잦아 산만한 인상을 줄 수 있습니다."
+
+    return [
+        ("시선 처리", max(0, gaze_score), gaze_feedback),
+        ("표정", expression_score, expression_feedback),
+        ("자세 안정성", posture_score, posture_feedback),
+    ]
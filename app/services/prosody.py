@@ -0,0 +1,181 @@
+import re
+
+import numpy as np
+
+from .decoder import SAMPLE_RATE
+from .vad import VoiceActivityDetector, _runs
+
+# 사람 목소리 기본 주파수 범위와 자기상관 설정
+MIN_F0, MAX_F0 = 75.0, 400.0
+MIN_LAG, MAX_LAG = int(SAMPLE_RATE / MAX_F0), int(SAMPLE_RATE / MIN_F0)
+VOICING_THRESHOLD = 0.45
+PITCH_BLOCK = 1024
+# 55Hz 기준 반음 단위 히스토그램 (1/4 반음 간격) — 답변 길이와 상관없이 메모리 일정
+SEMITONE_BINS = np.arange(0, 12 * np.log2(500 / 55) + 0.25, 0.25)
+
+MIN_PAUSE_SECONDS = 0.3
+LONG_PAUSE_SECONDS = 1.0
+
+_HANGUL_RE = re.compile("[가-힣]")
+_LATIN_VOWELS_RE = re.compile("[aeiouy]+", re.IGNORECASE)
+
+_vad = VoiceActivityDetector()
+
+
+def count_syllables(text):
+    # 한글은 글자 하나가 한 음절, 영문은 모음 묶음 수로 어림한다
+    return len(_HANGUL_RE.findall(text)) + len(_LATIN_VOWELS_RE.findall(text))
+
+
+def pitch_track(frames):
+    """프레임별 정규화 자기상관의 최댓값 위치로 f0를 구한다 (FFT로 모든 프레임을 한 번에 계산).
+
+    유성음으로 판단되지 않은 프레임은 결과에서 빠진다.
+    """
+    if not len(frames):
+        return np.zeros(0, dtype=np.float32)
+    nfft = 1 << int(np.ceil(np.log2(2 * frames.shape[1])))
+    pitches = []
+    for i in range(0, len(frames), PITCH_BLOCK):
+        block = frames[i:i + PITCH_BLOCK]
+        block = block - block.mean(axis=1, keepdims=True)
+        spectrum = np.fft.rfft(block, n=nfft, axis=1)
+        ac = np.fft.irfft(spectrum * np.conj(spectrum), n=nfft, axis=1)[:, :MAX_LAG + 2]
+        ac /= ac[:, :1] + 1e-10
+
+        rows = np.arange(len(ac))
+        lag = MIN_LAG + np.argmax(ac[:, MIN_LAG:MAX_LAG + 1], axis=1)
+        peak = ac[rows, lag]
+        # 포물선 보간으로 정수 lag 사이의 위치를 보정한다 (고음에서 반음 이하 해상도)
+        left, right = ac[rows, lag - 1], ac[rows, lag + 1]
+        denom = left - 2 * peak + right
+        shift = np.where(np.abs(denom) > 1e-10, 0.5 * (left - right) / np.where(denom == 0, 1, denom), 0.0)
+        voiced = peak > VOICING_THRESHOLD
+        pitches.append((SAMPLE_RATE / (lag + np.clip(shift, -0.5, 0.5)))[voiced])
+    return np.concatenate(pitches).astype(np.float32)
+
+
+class ProsodyTracker:
+    """이미 디코딩된 오디오와 Whisper 세그먼트로 말하기 속도, 쉼, 음높이 변화를 누적한다.
+
+    오디오를 여러 번에 나눠 넣어도(영상 업로드의 청크 전사) 통계는 고정 크기로만 유지한다.
+    """
+
+    def __init__(self):
+        self.syllables = 0
+        self.speech_seconds = 0.0
+        self.span_seconds = 0.0
+        self.pauses = 0
+        self.long_pauses = 0
+        self.pause_seconds = 0.0
+        self.frames = 0
+        self.voiced_frames = 0
+        self.pitch_hist = np.zeros(len(SEMITONE_BINS) - 1, dtype=np.int64)
+        self._pitch_sum = 0.0
+        self._pitch_sumsq = 0.0
+
+    def add(self, audio, segments=None, text=None):
+        frame = _vad.frame
+        n = len(audio) // frame
+        if not n:
+            return self
+        speech = _vad.speech_frames(audio)
+        frames = audio[:n * frame].reshape(n, frame)
+
+        # 1. 발화 구간: 세그먼트 시각이 있으면 그 범위, 없으면(스트리밍) 에너지로 잡은 첫/끝 발화 프레임
+        spoken = [s for s in segments or () if s["end"] > s["start"] and s["text"].strip()]
+        if spoken:
+            first = int(min(s["start"] for s in spoken) * SAMPLE_RATE) // frame
+            last = int(np.ceil(max(s["end"] for s in spoken) * SAMPLE_RATE / frame))
+            self.syllables += sum(count_syllables(s["text"]) for s in spoken)
+        elif speech.any():
+            voiced_at = np.flatnonzero(speech)
+            first, last = int(voiced_at[0]), int(voiced_at[-1]) + 1
+            self.syllables += count_syllables(text or "")
+        else:
+            return self
+        first, last = max(0, first), min(n, last)
+        span = speech[first:last]
+
+        # 2. 쉼: 발화 구간 안에서 MIN_PAUSE_SECONDS 이상 이어진 무음 프레임 묶음
+        seconds_per_frame = frame / SAMPLE_RATE
+        starts, ends = _runs(~span)
+        lengths = (ends - starts) * seconds_per_frame
+        lengths = lengths[lengths >= MIN_PAUSE_SECONDS]
+        self.pauses += len(lengths)
+        self.long_pauses += int(np.count_nonzero(lengths >= LONG_PAUSE_SECONDS))
+        self.pause_seconds += float(lengths.sum())
+        self.span_seconds += len(span) * seconds_per_frame
+        self.speech_seconds += len(span) * seconds_per_frame - float(lengths.sum())
+
+        # 3. 음높이: 발화 프레임만 골라 한 번에 자기상관
+        f0 = pitch_track(frames[first:last][span])
+        self.frames += int(np.count_nonzero(span))
+        self.voiced_frames += len(f0)
+        if len(f0):
+            semitones = 12 * np.log2(f0 / 55.0)
+            self.pitch_hist += np.histogram(semitones, bins=SEMITONE_BINS)[0]
+            self._pitch_sum += float(semitones.sum())
+            self._pitch_sumsq += float(np.square(semitones).sum())
+        return self
+
+    def _pitch_percentile(self, q):
+        cumulative = np.cumsum(self.pitch_hist)
+        i = int(np.searchsorted(cumulative, q * cumulative[-1]))
+        return float(SEMITONE_BINS[min(i, len(SEMITONE_BINS) - 2)] + 0.125)
+
+    def finish(self):
+        n = self.voiced_frames
+        mean = self._pitch_sum / n if n else 0.0
+        std = float(np.sqrt(max(0.0, self._pitch_sumsq / n - mean ** 2))) if n else 0.0
+        minutes = self.span_seconds / 60
+        return {
+            "syllables": self.syllables,
+            "speech_seconds": round(self.speech_seconds, 2),
+            "syllables_per_second": self.syllables / self.span_seconds if self.span_seconds else 0.0,
+            "articulation_rate": self.syllables / self.speech_seconds if self.speech_seconds else 0.0,
+            "pauses": self.pauses,
+            "long_pauses": self.long_pauses,
+            "pauses_per_minute": self.pauses / minutes if minutes else 0.0,
+            "pause_ratio": self.pause_seconds / self.span_seconds if self.span_seconds else 0.0,
+            "voiced_ratio": n / self.frames if self.frames else 0.0,
+            "pitch_hz": round(55.0 * 2 ** (mean / 12), 1) if n else None,
+            "pitch_std_semitones": round(std, 2),
+            "pitch_range_semitones": round(self._pitch_percentile(0.9) - self._pitch_percentile(0.1), 2) if n else 0.0,
+        }
+
+
+def analyze(audio, segments=None, text=None):
+    return ProsodyTracker().add(audio, segments, text).finish()
+
+
+def score_rows(stats):
+    if not stats["syllables"] or not stats["speech_seconds"]:
+        return [("말하기 속도", 0, "인식된 발화가 없어 말하기 속도를 평가하지 못했습니다.")]
+
+    rows = []
+    if stats["pitch_hz"] is not None:
+        std = stats["pitch_std_semitones"]
+        pitch_score = int(np.clip(round(90 - 15 * max(0.0, 2.0 - std) - 5 * max(0.0, std - 5.0)), 40, 95))
+        if std < 2.0:
+            pitch_feedback = "변화가 적어 단조로운 인상을 주었습니다."
+        elif std <= 5.0:
+            pitch_feedback = "강약 조절이 자연스러웠습니다."
+        else:
+            pitch_feedback = "높낮이 변화가 커서 다소 불안정하게 들렸습니다."
+        rows.append(("어조 높낮이", pitch_score, pitch_feedback))
+
+    # 면접 답변의 자연스러운 속도를 초당 4~5.5음절(쉼 포함)로 본다
+    rate = stats["syllables_per_second"]
+    speed_score = round(90 - 12 * max(0.0, 4.0 - rate) - 12 * max(0.0, rate - 5.5))
+    if rate > 5.5:
+        speed_feedback = "긴장으로 인해 약간 빠른 말투를 보였습니다."
+    elif rate < 4.0:
+        speed_feedback = "말하는 속도가 다소 느렸습니다."
+    else:
+        speed_feedback = "적절한 속도로 이야기했습니다."
+    if stats["long_pauses"] and stats["pauses_per_minute"] > 6:
+        speed_score -= 5
+        speed_feedback += " 1초 이상 말이 끊기는 구간이 잦았습니다."
+    rows.append(("말하기 속도", int(np.clip(speed_score, 30, 95)), speed_feedback))
+    return rows
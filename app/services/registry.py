@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from app.core import config
+from .decoder import SAMPLE_RATE
+
+
+class ModelEntry:
+    def __init__(self, name):
+        self.name = name
+        self.model = None
+        self.fp16 = False
+        self.ready = False
+        self.loading = False
+        self.error = None
+        self.load_seconds = None
+        # 로드는 한 번만, 추론은 모델 단위로 직렬화한다 (Whisper의 kv-cache hook은 재진입 불가)
+        self.load_lock = threading.Lock()
+        self.lock = threading.Lock()
+
+    def status(self):
+        return {
+            "model": self.name,
+            "ready": self.ready,
+            "loading": self.loading,
+            "fp16": self.fp16,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+        }
+
+
+class ModelRegistry:
+    """Whisper 모델을 처음 필요할 때(또는 앱 시작 시 백그라운드에서) 로드하고 워밍업까지 마친 뒤 ready로 표시한다."""
+
+    def __init__(self, default, device=None, fp16=None, language="ko"):
+        self.default = default
+        self.device = device
+        self.fp16 = fp16
+        self.language = language
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def entry(self, name=None):
+        name = name or self.default
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = ModelEntry(name)
+            return self._entries[name]
+
+    def get(self, name=None):
+        entry = self.entry(name)
+        if entry.ready:
+            return entry.model
+        with entry.load_lock:
+            if not entry.ready:
+                self._load(entry)
+        return entry.model
+
+    def register(self, name, model, fp16=False):
+        # 이미 만들어진 모델(벤치마크용 스텁 등)을 로드 없이 등록한다
+        entry = self.entry(name)
+        entry.model = model
+        entry.fp16 = fp16
+        entry.ready = True
+        return entry
+
+    def _load(self, entry):
+        entry.loading = True
+        entry.error = None
+        started = time.perf_counter()
+        try:
+            import whisper
+
+            print(f"📦 Whisper 모델 로드 중: {entry.name}")
+            model = whisper.load_model(entry.name, device=self.device)
+            entry.fp16 = self.fp16 if self.fp16 is not None else model.device.type == "cuda"
+            self._warmup(model, entry.fp16)
+            entry.model = model
+            entry.load_seconds = time.perf_counter() - started
+            entry.ready = True
+            print(f"✅ Whisper 모델 준비 완료: {entry.name} ({entry.load_seconds:.1f}s)")
+        except Exception as e:
+            entry.error = str(e)
+            print("❌ Whisper 모델 로드 실패:", e)
+            raise
+        finally:
+            entry.loading = False
+
+    def _warmup(self, model, fp16):
+        # 무음 1초로 encoder/decoder를 한 번 돌려 첫 요청의 커널 초기화 비용을 미리 치른다
+        import whisper
+
+        mel = whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(np.zeros(SAMPLE_RATE, dtype=np.float32)), model.dims.n_mels
+        ).to(model.device)
+        whisper.decode(model, mel, whisper.DecodingOptions(language=self.language, fp16=fp16))
+
+    async def preload(self, name=None):
+        try:
+            await asyncio.to_thread(self.get, name)
+        except Exception:
+            # 실패 원인은 status()/ready 엔드포인트로 노출하고, 다음 요청에서 다시 로드를 시도한다
+            pass
+
+    @property
+    def ready(self):
+        return self.entry().ready
+
+    def status(self):
+        self.entry()
+        with self._lock:
+            entries = list(self._entries.values())
+        return {"ready": self.ready, "models": [e.status() for e in entries]}
+
+
+registry = ModelRegistry(config.WHISPER_MODEL, config.WHISPER_DEVICE, config.WHISPER_FP16, config.WHISPER_LANGUAGE)
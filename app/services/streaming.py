@@ -0,0 +1,69 @@
+from .decoder import SAMPLE_RATE
+
+
+class StreamingTranscriber:
+    """슬라이딩 윈도우 방식의 점진적 STT.
+
+    확정(commit)된 구간은 다시 추론하지 않으므로 최종 결과까지 걸리는 시간은
+    전체 답변 길이가 아니라 마지막 윈도우 길이에만 비례한다.
+    """
+
+    def __init__(self, transcribe, step_seconds=1.0, commit_after_seconds=10.0, commit_margin_seconds=2.0,
+                 max_window_seconds=25.0):
+        # transcribe: float32 16kHz 오디오를 받아 Whisper 결과 dict를 돌려주는 코루틴 함수
+        self._transcribe = transcribe
+        self.step = int(step_seconds * SAMPLE_RATE)
+        self.commit_after = commit_after_seconds
+        self.commit_margin = commit_margin_seconds
+        self.max_window = max_window_seconds
+        self.committed = []
+        self.offset = 0
+        self._last_end = 0
+        self._tail = ""
+
+    def needs_pass(self, audio):
+        return len(audio) - self._last_end >= self.step
+
+    async def update(self, audio):
+        # 마지막 추론 이후 step 이상 새 오디오가 쌓였을 때만 윈도우를 다시 추론한다
+        if not self.needs_pass(audio):
+            return None
+        end = len(audio)
+        window = audio[self.offset:end]
+        result = await self._transcribe(window)
+        self._last_end = end
+        self._commit_stable(result["segments"], len(window) / SAMPLE_RATE)
+        return self.partial
+
+    async def finalize(self, audio, **kwargs):
+        window = audio[self.offset:]
+        if len(window):
+            result = await self._transcribe(window, **kwargs)
+            self.committed.extend(s["text"].strip() for s in result["segments"])
+        self.offset = len(audio)
+        self._tail = ""
+        return self.text
+
+    def _commit_stable(self, segments, window_seconds):
+        # 윈도우가 충분히 길어지면 라이브 가장자리에서 먼 세그먼트를 확정하고 윈도우 시작점을 옮긴다
+        stable = []
+        if window_seconds >= self.commit_after:
+            stable = [s for s in segments if s["end"] <= window_seconds - self.commit_margin]
+        if not stable and window_seconds >= self.max_window:
+            # 긴 세그먼트 하나가 윈도우를 계속 붙잡고 있으면 마지막 하나만 남기고 강제로 확정한다
+            stable = segments[:-1] or segments
+        if stable:
+            self.committed.extend(s["text"].strip() for s in stable)
+            self.offset += int(stable[-1]["end"] * SAMPLE_RATE)
+        elif not segments and window_seconds >= self.max_window:
+            # 긴 무음 구간은 버리고 라이브 가장자리 근처만 남긴다
+            self.offset += int((window_seconds - self.commit_margin) * SAMPLE_RATE)
+        self._tail = " ".join(s["text"].strip() for s in segments[len(stable):])
+
+    @property
+    def text(self):
+        return " ".join(t for t in self.committed if t)
+
+    @property
+    def partial(self):
+        return " ".join(t for t in (self.text, self._tail) if t)
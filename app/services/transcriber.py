@@ -0,0 +1,69 @@
+from app.core import config
+from . import metrics
+from .inference import executor
+from .batching import BatchScheduler, decode_batch, split_segments, merge_results
+from .registry import registry
+
+
+def _transcribe_sync(audio):
+    # 모델은 registry가 처음 필요할 때(또는 시작 시 백그라운드에서) 로드한다
+    model = registry.get()
+    entry = registry.entry()
+    with entry.lock:
+        return model.transcribe(audio, language=registry.language, fp16=entry.fp16)
+
+
+def _decode_batch_sync(segments):
+    model = registry.get()
+    entry = registry.entry()
+    with entry.lock:
+        # 배치에 세그먼트가 하나뿐이면 배치로 얻는 이득이 없으므로 transcribe()를 그대로 쓴다
+        if len(segments) == 1:
+            return [model.transcribe(segments[0], language=registry.language, fp16=entry.fp16)]
+        results = decode_batch(model, segments, language=registry.language, fp16=entry.fp16)
+        # 배치 디코딩으로 부족했던 세그먼트는 temperature fallback과 seek이 있는 transcribe()로 다시 돌린다
+        return [
+            result if result is not None
+            else model.transcribe(segment, language=registry.language, fp16=entry.fp16)
+            for segment, result in zip(segments, results)
+        ]
+
+
+async def _run_batch(segments):
+    return await executor.run(_decode_batch_sync, segments)
+
+
+# 배치 대기열은 실행기 대기열 한 칸을 배치 하나로 보고 같은 한도(INFERENCE_QUEUE_SIZE)를 세그먼트 단위로 적용한다
+scheduler = BatchScheduler(_run_batch, config.WHISPER_BATCH_SIZE, config.WHISPER_BATCH_WAIT_MS,
+                           executor.max_queue * config.WHISPER_BATCH_SIZE)
+
+
+async def transcribe_local(audio, on_queued=None):
+    """이 프로세스가 가진 Whisper 모델로 추론한다 (웹 워커 단독 모드와 추론 서버가 공유)."""
+    if scheduler.max_batch_size <= 1:
+        return await executor.run(_transcribe_sync, audio, on_queued=on_queued)
+
+    # 30초 단위로 나눈 세그먼트를 다른 세션의 세그먼트와 함께 배치 추론한 뒤 원래 시간축으로 합친다
+    parts = split_segments(audio)
+    results = await scheduler.submit_many([segment for _, segment in parts], on_queued)
+    return merge_results([(offset, result) for (offset, _), result in zip(parts, results)])
+
+
+def queue_depth():
+    # 배치를 쓰면 요청은 실행기가 아니라 배치 대기열에서 기다린다
+    return executor.depth + scheduler.depth
+
+
+def stats():
+    return {
+        **executor.stats(),
+        "queue_depth": queue_depth(),
+        "queue_size": scheduler.max_queue if scheduler.max_batch_size > 1 else executor.max_queue,
+        "rejected": executor.rejected + scheduler.rejected,
+        "batching": scheduler.stats(),
+    }
+
+
+metrics.Gauge("interview_inference_queue_depth", "대기 중인 추론 작업 수", fn=queue_depth)
+metrics.Counter("interview_inference_rejected_total", "대기열이 가득 차 거절된 작업 수",
+                fn=lambda: executor.rejected + scheduler.rejected)
@@ -0,0 +1,105 @@
+import numpy as np
+
+from .decoder import SAMPLE_RATE
+
+
+class SpeechTimeline:
+    """무음을 잘라낸 오디오의 시각을 원본 오디오의 시각으로 되돌린다."""
+
+    def __init__(self, regions):
+        # regions: 원본 기준 (start, end) 샘플 구간 목록
+        self.regions = regions
+        lengths = np.array([end - start for start, end in regions], dtype=np.int64)
+        self._trimmed_starts = (np.concatenate([[0], np.cumsum(lengths)[:-1]]) / SAMPLE_RATE
+                                if regions else np.zeros(0))
+        self._original_starts = np.array([start for start, _ in regions], dtype=np.float64) / SAMPLE_RATE
+
+    def to_original(self, t):
+        if not self.regions:
+            return t
+        i = max(0, int(np.searchsorted(self._trimmed_starts, t, side="right")) - 1)
+        return float(self._original_starts[i] + (t - self._trimmed_starts[i]))
+
+    def remap(self, result):
+        for segment in result["segments"]:
+            segment["start"] = self.to_original(segment["start"])
+            segment["end"] = self.to_original(segment["end"])
+        return result
+
+
+class VoiceActivityDetector:
+    """프레임 단위 에너지/영교차율로 발화 구간만 골라내는 CPU VAD."""
+
+    def __init__(self, frame_ms=30, threshold_db=10.0, floor_db=-55.0, min_spread_db=15.0, min_speech_ms=200,
+                 min_silence_ms=400, pad_ms=150):
+        self.frame = SAMPLE_RATE * frame_ms // 1000
+        self.threshold_db = threshold_db
+        self.floor_db = floor_db
+        self.min_spread_db = min_spread_db
+        self.min_speech = max(1, min_speech_ms // frame_ms)
+        self.min_silence = max(1, min_silence_ms // frame_ms)
+        self.pad = SAMPLE_RATE * pad_ms // 1000
+        self.input_seconds = 0.0
+        self.speech_seconds = 0.0
+
+    def speech_frames(self, audio):
+        n = len(audio) // self.frame
+        frames = audio[:n * self.frame].reshape(n, self.frame)
+        energy_db = 10 * np.log10(np.mean(np.square(frames), axis=1) + 1e-10)
+        zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+
+        # 배경 소음 수준(하위 10%)보다 충분히 크면 발화, 조금 작더라도 영교차율이 높으면 무성 자음으로 본다.
+        # 쉬지 않고 말한 답변이나 짧은 스트리밍 윈도우처럼 조용한 구간이 없어 에너지 폭이 좁으면
+        # 하위 10%도 발화이므로 소음 수준을 추정하지 않고 절대 하한(floor_db)만으로 판단한다
+        if n:
+            noise, loud = np.percentile(energy_db, [10, 90])
+        else:
+            noise = loud = self.floor_db
+        if loud - noise < self.min_spread_db:
+            threshold = self.floor_db
+        else:
+            threshold = max(noise + self.threshold_db, self.floor_db)
+        return (energy_db > threshold) | ((energy_db > threshold - 6) & (zcr > 0.3))
+
+    def detect(self, audio):
+        speech = self.speech_frames(audio)
+        if not speech.any():
+            return []
+
+        # 짧은 쉼은 발화에 붙이고, 너무 짧은 발화는 잡음으로 버린다
+        starts, ends = _runs(speech)
+        keep = np.concatenate([[True], starts[1:] - ends[:-1] >= self.min_silence])
+        starts = starts[keep]
+        ends = np.concatenate([ends[np.flatnonzero(keep)[1:] - 1], ends[-1:]])
+        long_enough = ends - starts >= self.min_speech
+        starts, ends = starts[long_enough], ends[long_enough]
+
+        regions = []
+        for start, end in zip(starts * self.frame - self.pad, ends * self.frame + self.pad):
+            start, end = max(0, int(start)), min(len(audio), int(end))
+            if regions and start <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], end)
+            else:
+                regions.append((start, end))
+        return regions
+
+    def trim(self, audio):
+        regions = self.detect(audio)
+        speech = (np.concatenate([audio[start:end] for start, end in regions])
+                  if regions else np.zeros(0, dtype=np.float32))
+        self.input_seconds += len(audio) / SAMPLE_RATE
+        self.speech_seconds += len(speech) / SAMPLE_RATE
+        return speech, SpeechTimeline(regions)
+
+    def stats(self):
+        return {
+            "input_seconds": round(self.input_seconds, 2),
+            "speech_seconds": round(self.speech_seconds, 2),
+            "speech_ratio": self.speech_seconds / self.input_seconds if self.input_seconds else 0.0,
+        }
+
+
+def _runs(mask):
+    # True 구간의 [시작, 끝) 프레임 인덱스
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
@@ -0,0 +1,218 @@
+import re
+import time
+from collections import deque
+
+from app.core import config
+
+FILLERS = frozenset(("음", "어", "으음", "어어", "뭐", "막", "약간", "이제", "그러니까", "그니까", "있잖아요"))
+
+# 답변 구조를 보여주는 담화 표지 (범주별)
+STRUCTURE_MARKERS = {
+    "intro": ("먼저", "우선", "첫째", "첫 번째로", "결론부터"),
+    "sequence": ("둘째", "셋째", "두 번째로", "세 번째로", "다음으로", "그 다음", "마지막으로"),
+    "causal": ("왜냐하면", "때문에", "그래서", "따라서", "그러므로", "덕분에"),
+    "example": ("예를 들어", "예를 들면", "예시로", "예컨대", "실제로"),
+    "conclusion": ("결론적으로", "정리하면", "요약하면", "결국"),
+}
+
+_WORD_RE = re.compile(r"[\w']+")
+_SENTENCE_RE = re.compile(r"[.?!。]+|\n+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize(text):
+    return _SPACE_RE.sub(" ", text.lower()).strip()
+
+
+def _is_word_char(ch):
+    return ch.isascii() and ch.isalnum()
+
+
+class AhoCorasick:
+    """여러 패턴을 한 번의 텍스트 순회로 찾는 Aho-Corasick 오토마톤 (한 번 만들어 재사용한다).
+
+    검색 비용은 텍스트 길이 + 매치 수에 비례하고 패턴 수와는 무관하다.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] += (index,)
+
+        # BFS로 실패 링크를 잇고, 실패 링크 쪽 출력도 미리 합쳐 둔다
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def iter(self, text):
+        # (시작, 끝, 패턴 번호)
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                yield i + 1 - len(patterns[index]), i + 1, index
+
+    def find(self, text):
+        """겹치는 매치 중 가장 왼쪽, 그다음 가장 긴 것만 남긴다. 영문 패턴은 단어 경계에서만 인정한다."""
+        matches = sorted(self.iter(text), key=lambda m: (m[0], m[0] - m[1]))
+        found = []
+        last_end = 0
+        for start, end, index in matches:
+            if start < last_end:
+                continue
+            if start > 0 and _is_word_char(text[start]) and _is_word_char(text[start - 1]):
+                continue
+            if end < len(text) and _is_word_char(text[end - 1]) and _is_word_char(text[end]):
+                continue
+            found.append((start, end, index))
+            last_end = end
+        return found
+
+
+class Glossary:
+    """직무 용어집. 용어 → (표준 표기, 오용 여부)를 Aho-Corasick 오토마톤 하나로 찾는다."""
+
+    def __init__(self, entries):
+        terms = {}
+        for term, canonical, misuse in entries:
+            terms[normalize(term)] = (term, canonical, misuse)
+        self.entries = list(terms.values())
+        self.matcher = AhoCorasick(terms)
+
+    @classmethod
+    def load(cls, path):
+        entries = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                fields = [field.strip() for field in line.rstrip("\n").split("\t")]
+                term = fields[0]
+                canonical = fields[1] if len(fields) > 1 and fields[1] else term
+                misuse = len(fields) > 2 and fields[2] == "misuse"
+                entries.append((term, canonical, misuse))
+        return cls(entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def find(self, text):
+        return [self.entries[index] for _, _, index in self.matcher.find(text)]
+
+
+def _load_glossary():
+    started = time.perf_counter()
+    try:
+        glossary = Glossary.load(config.GLOSSARY_PATH)
+    except OSError as e:
+        print("⚠️ 용어집을 읽지 못해 용어 평가를 건너뜁니다:", e)
+        return Glossary([])
+    print(f"📚 용어집 로드: {len(glossary)}개 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+    return glossary
+
+
+glossary = _load_glossary()
+_marker_categories = [(category, normalize(marker)) for category, markers in STRUCTURE_MARKERS.items() for marker in markers]
+_markers = AhoCorasick(marker for _, marker in _marker_categories)
+
+
+def analyze(text, duration=None):
+    """전사 텍스트에서 군말 비율, 용어 사용/오용, 답변 구조를 뽑는다."""
+    normalized = normalize(text)
+    words = _WORD_RE.findall(normalized)
+    fillers = sum(1 for word in words if word in FILLERS)
+    sentences = [s for s in _SENTENCE_RE.split(normalized) if s.strip()]
+
+    used = glossary.find(normalized)
+    misuses = [{"term": term, "canonical": canonical} for term, canonical, misuse in used if misuse]
+    structure = sorted({_marker_categories[index][0] for _, _, index in _markers.find(normalized)})
+
+    return {
+        "words": len(words),
+        "fillers": fillers,
+        "filler_rate": fillers / len(words) if words else 0.0,
+        "fillers_per_minute": fillers / (duration / 60) if duration else None,
+        "sentences": len(sentences),
+        "words_per_sentence": len(words) / len(sentences) if sentences else 0.0,
+        "term_mentions": len(used),
+        "terms": sorted({canonical for _, canonical, misuse in used if not misuse}),
+        "misuses": misuses,
+        "structure": structure,
+    }
+
+
+def score_rows(stats):
+    if stats["words"] < 5:
+        return [("개념 설명력", 0, "인식된 답변이 거의 없어 언어적 표현을 평가하지 못했습니다.")]
+
+    terms = len(stats["terms"])
+    concept_score = 50 + min(30, 6 * terms)
+    if "example" in stats["structure"]:
+        concept_score += 10
+    if 6 <= stats["words_per_sentence"] <= 30:
+        concept_score += 10
+    if stats["words"] < 30:
+        concept_score = min(concept_score, 60)
+        concept_feedback = "답변이 짧아 개념을 충분히 설명하지 못했습니다."
+    elif terms >= 3 and "example" in stats["structure"]:
+        concept_feedback = "핵심 개념을 용어와 예시를 들어 구체적으로 설명했습니다."
+    elif terms >= 3:
+        concept_feedback = "핵심 개념은 잘 짚었으나 예시 활용이 부족했습니다."
+    else:
+        concept_feedback = "기본적인 설명은 가능하나 관련 개념을 더 구체적으로 언급하면 좋겠습니다."
+
+    mentions = stats["term_mentions"]
+    if not mentions:
+        term_score = 60
+        term_feedback = "기술 용어가 거의 사용되지 않았습니다."
+    else:
+        term_score = round(50 + 50 * (1 - len(stats["misuses"]) / mentions))
+        if stats["misuses"]:
+            misuse = stats["misuses"][0]
+            term_feedback = f"'{misuse['term']}'보다는 '{misuse['canonical']}'이(가) 정확한 표현입니다."
+        else:
+            term_feedback = "기술 용어를 정확하게 사용했습니다."
+
+    flow = [c for c in ("intro", "sequence", "causal", "conclusion") if c in stats["structure"]]
+    logic_score = 55 + 10 * len(flow) + (5 if "example" in stats["structure"] else 0)
+    logic_score -= min(20, round(stats["filler_rate"] * 200))
+    if len(flow) >= 3:
+        logic_feedback = "답변의 흐름이 단계적으로 잘 정리되어 있었습니다."
+    elif "causal" in flow:
+        logic_feedback = "이유는 설명했지만 순서나 결론을 정리해 주면 더 명확합니다."
+    else:
+        logic_feedback = "과정 설명이 생략되어 있어 '먼저/그래서/결론적으로'처럼 흐름을 드러내면 좋겠습니다."
+    if stats["filler_rate"] > 0.05:
+        logic_feedback += " '음', '어' 같은 군말이 잦았습니다."
+
+    return [
+        ("개념 설명력", min(100, concept_score), concept_feedback),
+        ("용어 정확성", term_score, term_feedback),
+        ("문제 해결 로직 전달", max(0, min(100, logic_score)), logic_feedback),
+    ]
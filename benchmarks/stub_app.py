@@ -0,0 +1,31 @@
+import os
+import time
+
+# 스텁 모델은 transcribe()만 흉내내므로 배치 경로 대신 transcribe 경로를 쓰고, 실제 모델은 로드하지 않는다
+os.environ.setdefault("WHISPER_BATCH_SIZE", "1")
+os.environ.setdefault("WHISPER_PRELOAD", "0")
+
+from app.core import config  # noqa: E402
+from app.services.decoder import SAMPLE_RATE  # noqa: E402
+from app.services.registry import registry  # noqa: E402
+
+
+class StubWhisper:
+    """오디오 길이 * rtf 만큼 (GIL을 놓은 채) 시간을 쓰고 고정 문장을 돌려주는 Whisper 대역 (오프라인 벤치마크용)."""
+
+    def __init__(self, rtf):
+        self.rtf = rtf
+
+    def transcribe(self, audio, **kwargs):
+        seconds = len(audio) / SAMPLE_RATE
+        time.sleep(seconds * self.rtf)
+        return {
+            "text": " 안녕하세요 벤치마크 답변입니다",
+            "segments": [{"start": 0.0, "end": seconds, "text": " 안녕하세요 벤치마크 답변입니다"}],
+            "language": registry.language,
+        }
+
+
+registry.register(config.WHISPER_MODEL, StubWhisper(float(os.environ.get("STUB_RTF", "0.05"))))
+
+from app.main import app  # noqa: E402,F401
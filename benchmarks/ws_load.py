@@ -0,0 +1,327 @@
+"""WebSocket 엔드포인트 부하/지연 벤치마크.
+
+합성 WebM 음성/무음 클립과 이미지 프레임을 로컬에서 만들고, N개의 /ws/transcript, /ws/expression
+세션을 동시에 열어 p50/p95/p99 지연, real-time factor, 처리량, 서버 peak RSS를 JSON으로 출력한다.
+
+    # 스텁 모델로 서버를 직접 띄워 오프라인 측정
+    python -m benchmarks.ws_load --serve stub --sessions 8 --output bench.json
+
+    # tiny Whisper 모델로 측정하고 기록해 둔 기준값과 비교
+    python -m benchmarks.ws_load --serve tiny --sessions 4 --baseline bench.json
+
+    # 이미 떠 있는 서버에 측정
+    python -m benchmarks.ws_load --url ws://localhost:8000 --sessions 16
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import websockets
+
+SPEECH_EXPR = "0.3*sin(2*PI*{pitch}*t)*(0.5+0.5*sin(2*PI*4*t))*(0.8+0.2*sin(2*PI*0.7*t))"
+
+
+def make_clip(ffmpeg, seconds, speech_ratio, period=4.0, variant=0):
+    """period초마다 앞부분 speech_ratio 만큼은 음성 비슷한 AM 톤, 나머지는 약한 잡음인 WebM(Opus) 클립.
+
+    variant마다 음높이를 조금씩 바꿔 서버의 전사 캐시에 걸리지 않는 서로 다른 클립을 만든다.
+    """
+    speech = period * speech_ratio
+    tone = SPEECH_EXPR.format(pitch=180 + variant * 0.5)
+    expr = f"if(lt(mod(t\\,{period})\\,{speech})\\,{tone}\\,0)+0.002*(random(0)-0.5)"
+    cmd = [
+        ffmpeg, "-loglevel", "error", "-f", "lavfi",
+        "-i", f"aevalsrc=exprs={expr}:s=48000:d={seconds}",
+        "-c:a", "libopus", "-b:a", "32k", "-f", "webm", "pipe:1",
+    ]
+    return subprocess.run(cmd, capture_output=True, check=True).stdout
+
+
+def make_frames(count, size=(640, 480), seed=0):
+    from PIL import Image, ImageDraw
+
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(count):
+        pixels = rng.integers(0, 40, (size[1], size[0], 3), dtype=np.uint8) + 90
+        image = Image.fromarray(pixels)
+        draw = ImageDraw.Draw(image)
+        cx, cy = size[0] // 2 + int(rng.integers(-20, 20)), size[1] // 2
+        draw.ellipse((cx - 90, cy - 120, cx + 90, cy + 120), fill=(224, 172, 140))
+        buf = io.BytesIO()
+        image.save(buf, "JPEG", quality=80)
+        frames.append(buf.getvalue())
+    return frames
+
+
+def percentiles(values):
+    if not values:
+        return None
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": round(float(p50), 2), "p95": round(float(p95), 2), "p99": round(float(p99), 2),
+            "mean": round(float(np.mean(values)), 2), "count": len(values)}
+
+
+async def transcript_session(url, clip, seconds, mode, chunk_seconds):
+    path = "/ws/transcript?mode=stream" if mode == "stream" else "/ws/transcript"
+    partials = 0
+    async with websockets.connect(url + path, max_size=None) as ws:
+        started = time.perf_counter()
+        if mode == "stream":
+            # MediaRecorder처럼 녹음 속도에 맞춰 바이트 조각을 흘려보낸다
+            chunks = max(1, int(seconds / chunk_seconds))
+            step = -(-len(clip) // chunks)
+            for i in range(0, len(clip), step):
+                await ws.send(clip[i:i + step])
+                await asyncio.sleep(chunk_seconds)
+            await ws.send(json.dumps({"event": "end"}))
+        else:
+            await ws.send(clip)
+        sent = time.perf_counter()
+
+        while True:
+            message = json.loads(await ws.recv())
+            if "partial" in message:
+                partials += 1
+            elif "transcript" in message:
+                break
+        done = time.perf_counter()
+
+    return {
+        "latency_ms": (done - sent) * 1000,
+        "total_ms": (done - started) * 1000,
+        "audio_seconds": seconds,
+        "partials": partials,
+        "error": message.get("error") or message.get("expression"),
+    }
+
+
+async def expression_session(url, frames, fps, seconds):
+    sent_at = {}
+    latencies = []
+    results = 0
+
+    async with websockets.connect(url + "/ws/expression", max_size=None) as ws:
+        async def receive():
+            nonlocal results
+            while True:
+                message = json.loads(await ws.recv())
+                if "frame" in message:
+                    results += 1
+                    latencies.append((time.perf_counter() - sent_at[message["frame"]]) * 1000)
+
+        receiver = asyncio.create_task(receive())
+        total = int(fps * seconds)
+        for i in range(total):
+            sent_at[i + 1] = time.perf_counter()
+            await ws.send(frames[i % len(frames)])
+            await asyncio.sleep(1 / fps)
+        await asyncio.sleep(0.5)
+        receiver.cancel()
+
+    return {"sent": total, "results": results, "latencies": latencies}
+
+
+async def run_load(args, clips, frames):
+    async def transcript_rounds(session):
+        runs = []
+        for i in range(args.rounds):
+            clip = clips[1 + session * args.rounds + i]
+            runs.append(await transcript_session(args.url, clip, args.clip_seconds, args.mode, args.chunk_seconds))
+        return runs
+
+    # 프로세스 풀 기동, 모델 첫 호출 같은 1회성 비용은 측정에서 뺀다
+    if args.sessions:
+        await transcript_session(args.url, clips[0], args.clip_seconds, "oneshot", args.chunk_seconds)
+    if args.expression_sessions:
+        await expression_session(args.url, frames, args.fps, 0.5)
+
+    started = time.perf_counter()
+    tasks = [transcript_rounds(session) for session in range(args.sessions)]
+    tasks += [expression_session(args.url, frames, args.fps, args.frame_seconds)
+              for _ in range(args.expression_sessions)]
+    outputs = await asyncio.gather(*tasks, return_exceptions=True)
+    wall = time.perf_counter() - started
+
+    transcripts = [r for out in outputs[:args.sessions] if not isinstance(out, BaseException) for r in out]
+    expressions = [out for out in outputs[args.sessions:] if not isinstance(out, BaseException)]
+    failures = [repr(out) for out in outputs if isinstance(out, BaseException)]
+
+    ok = [r for r in transcripts if not r["error"]]
+    audio_seconds = sum(r["audio_seconds"] for r in ok)
+    sent = sum(e["sent"] for e in expressions)
+    analyzed = sum(e["results"] for e in expressions)
+
+    return {
+        "wall_seconds": round(wall, 2),
+        "failures": failures,
+        "transcript": {
+            "requests": len(transcripts),
+            "errors": len(transcripts) - len(ok),
+            "latency_ms": percentiles([r["latency_ms"] for r in ok]),
+            "total_ms": percentiles([r["total_ms"] for r in ok]),
+            # 답변이 끝난 뒤 결과까지 걸린 시간 / 답변 길이
+            "rtf": percentiles([r["latency_ms"] / 1000 / r["audio_seconds"] for r in ok]),
+            "partials_per_request": np.mean([r["partials"] for r in ok]).item() if ok else 0,
+            "throughput_audio_seconds_per_second": round(audio_seconds / wall, 3),
+        },
+        "expression": {
+            "sessions": len(expressions),
+            "frames_sent": sent,
+            "frames_answered": analyzed,
+            "drop_ratio": round(1 - analyzed / sent, 3) if sent else 0.0,
+            "latency_ms": percentiles([l for e in expressions for l in e["latencies"]]),
+        },
+    }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def http_json(url, timeout=2):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, None
+    except (urllib.error.URLError, OSError):
+        return None, None
+
+
+def start_server(model, port, ready_timeout):
+    env = dict(os.environ)
+    if model == "stub":
+        target = "benchmarks.stub_app:app"
+    else:
+        target = "app.main:app"
+        env["WHISPER_MODEL"] = model
+    # 서버 로그가 JSON 결과(stdout)에 섞이지 않도록 stderr로 보낸다
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=sys.stderr,
+    )
+    deadline = time.monotonic() + ready_timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited before becoming ready")
+        status, _ = http_json(f"http://127.0.0.1:{port}/ready")
+        if status == 200:
+            return proc
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("server did not become ready in time")
+
+
+def peak_rss_mb(pid):
+    # 리눅스에서는 /proc의 VmHWM(최대 RSS)을 읽는다
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def compare(report, baseline):
+    # 값이 1보다 크면 기준값보다 큼 (지연/메모리는 낮을수록, 처리량은 높을수록 좋다)
+    pairs = {
+        "transcript_p50_ms": ("transcript", "latency_ms", "p50"),
+        "transcript_p95_ms": ("transcript", "latency_ms", "p95"),
+        "transcript_rtf_p50": ("transcript", "rtf", "p50"),
+        "transcript_throughput": ("transcript", "throughput_audio_seconds_per_second"),
+        "expression_p95_ms": ("expression", "latency_ms", "p95"),
+        "peak_rss_mb": ("server", "peak_rss_mb"),
+    }
+    ratios = {}
+    for name, keys in pairs.items():
+        current, previous = report, baseline
+        for key in keys:
+            current = current.get(key) if isinstance(current, dict) else None
+            previous = previous.get(key) if isinstance(previous, dict) else None
+        if current is not None and previous:
+            ratios[name] = round(current / previous, 3)
+    return ratios
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="측정할 서버 (예: ws://localhost:8000)")
+    parser.add_argument("--serve", default=None, help="직접 띄울 모델: stub 또는 Whisper 모델 이름 (예: tiny)")
+    parser.add_argument("--server-pid", type=int, default=None, help="--url 서버의 PID (peak RSS 측정용)")
+    parser.add_argument("--sessions", type=int, default=4, help="동시 /ws/transcript 세션 수")
+    parser.add_argument("--rounds", type=int, default=3, help="세션당 연속 답변 수")
+    parser.add_argument("--mode", choices=["oneshot", "stream"], default="oneshot")
+    parser.add_argument("--clip-seconds", type=float, default=20.0)
+    parser.add_argument("--speech-ratio", type=float, default=0.6, help="클립에서 음성이 차지하는 비율")
+    parser.add_argument("--chunk-seconds", type=float, default=0.5, help="stream 모드 청크 간격")
+    parser.add_argument("--expression-sessions", type=int, default=4)
+    parser.add_argument("--fps", type=float, default=10.0)
+    parser.add_argument("--frame-seconds", type=float, default=10.0)
+    parser.add_argument("--ffmpeg", default=os.environ.get("FFMPEG_BIN", "ffmpeg"))
+    parser.add_argument("--ready-timeout", type=float, default=600.0)
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    parser.add_argument("--output", default=None, help="결과 JSON을 저장할 경로 (기본: stdout)")
+    args = parser.parse_args()
+
+    if not args.url and not args.serve:
+        parser.error("--url 또는 --serve 중 하나가 필요합니다")
+
+    # 요청마다 다른 클립을 보내 캐시 적중 없이 실제 추론 비용을 잰다 (0번은 워밍업용)
+    clips = [make_clip(args.ffmpeg, args.clip_seconds, args.speech_ratio, variant=i)
+             for i in range(1 + args.sessions * args.rounds)] if args.sessions else []
+    frames = make_frames(8)
+
+    proc = None
+    if args.serve:
+        port = free_port()
+        proc = start_server(args.serve, port, args.ready_timeout)
+        args.url = f"ws://127.0.0.1:{port}"
+    server_pid = proc.pid if proc else args.server_pid
+    http_url = args.url.replace("ws://", "http://", 1).replace("wss://", "https://", 1)
+
+    try:
+        report = asyncio.run(run_load(args, clips, frames))
+        report["server"] = {
+            "peak_rss_mb": peak_rss_mb(server_pid) if server_pid else None,
+            "inference": http_json(http_url + "/inference/status")[1],
+            "expression": http_json(http_url + "/expression/status")[1],
+        }
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    if proc is not None and report["server"]["peak_rss_mb"] is None:
+        # /proc이 없는 환경에서는 종료된 자식 프로세스의 최대 RSS로 대신한다 (리눅스 KB, macOS 바이트)
+        maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        report["server"]["peak_rss_mb"] = round(maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+    report["config"] = {k: v for k, v in vars(args).items() if k not in ("baseline", "output")}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["vs_baseline"] = compare(report, json.load(f))
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import json
+
+from repository import Repository
+
+# 분석 기록 한 페이지에 보여줄 평가 수
+PAGE_SIZE = 20
+
+
+class EvaluationStore(Repository):
+    """사용자별 면접 평가 기록 저장소.
+
+    평가는 (username, eval_date) 인덱스로 조회하고, 추이 그래프용 일자별 점수는 평가를 저장할 때
+    score_trend 테이블에 함께 누적해 두므로 그래프를 그릴 때 전체 기록을 다시 읽지 않는다.
+    사용자별 version은 평가가 추가될 때만 올라가며 화면 쪽 캐시의 무효화 키로 쓴다.
+    """
+
+    QUERIES = {
+        "insert_evaluation": (
+            "INSERT INTO evaluations"
+            " (username, eval_date, total, summary, details, nonverbal, verbal, video_url)"
+            " VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+        ),
+        # 같은 사용자/날짜의 평가가 동시에 저장돼도 잠금 경합이나 중복 키 오류가 없도록 한 문장으로 upsert한다
+        "upsert_trend": {
+            "mysql": (
+                "INSERT INTO score_trend (username, eval_date, sessions, total_sum) VALUES (%s, %s, 1, %s)"
+                " ON DUPLICATE KEY UPDATE sessions=sessions+1, total_sum=total_sum+VALUES(total_sum)"
+            ),
+            "sqlite": (
+                "INSERT INTO score_trend (username, eval_date, sessions, total_sum) VALUES (%s, %s, 1, %s)"
+                " ON CONFLICT(username, eval_date) DO UPDATE SET"
+                " sessions=sessions+1, total_sum=total_sum+excluded.total_sum"
+            ),
+        },
+        "upsert_version": {
+            "mysql": (
+                "INSERT INTO evaluation_versions (username, version) VALUES (%s, 1)"
+                " ON DUPLICATE KEY UPDATE version=version+1"
+            ),
+            "sqlite": (
+                "INSERT INTO evaluation_versions (username, version) VALUES (%s, 1)"
+                " ON CONFLICT(username) DO UPDATE SET version=version+1"
+            ),
+        },
+        "version": "SELECT version FROM evaluation_versions WHERE username=%s",
+        "history_first": (
+            "SELECT id, eval_date, total FROM evaluations WHERE username=%s"
+            " ORDER BY eval_date DESC, id DESC LIMIT %s"
+        ),
+        # (eval_date, id) 키셋 페이지네이션: OFFSET 없이 이전 페이지의 마지막 행 다음부터 읽는다
+        "history_after": (
+            "SELECT id, eval_date, total FROM evaluations WHERE username=%s"
+            " AND (eval_date < %s OR (eval_date = %s AND id < %s))"
+            " ORDER BY eval_date DESC, id DESC LIMIT %s"
+        ),
+        "evaluation": (
+            "SELECT id, eval_date, total, summary, details, nonverbal, verbal, video_url"
+            " FROM evaluations WHERE id=%s AND username=%s"
+        ),
+        "trend": "SELECT eval_date, sessions, total_sum FROM score_trend WHERE username=%s ORDER BY eval_date",
+    }
+    SCHEMA = {
+        "sqlite": [
+            """
+            CREATE TABLE IF NOT EXISTS evaluations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL,
+                eval_date TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                summary TEXT NOT NULL,
+                details TEXT NOT NULL,
+                nonverbal TEXT NOT NULL,
+                verbal TEXT NOT NULL,
+                video_url TEXT
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_evaluations_user_date ON evaluations (username, eval_date, id)",
+            """
+            CREATE TABLE IF NOT EXISTS score_trend (
+                username TEXT NOT NULL,
+                eval_date TEXT NOT NULL,
+                sessions INTEGER NOT NULL,
+                total_sum INTEGER NOT NULL,
+                PRIMARY KEY (username, eval_date)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS evaluation_versions (
+                username TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+            """,
+        ],
+        "mysql": [
+            """
+            CREATE TABLE IF NOT EXISTS evaluations (
+                id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                username VARCHAR(255) NOT NULL,
+                eval_date DATE NOT NULL,
+                total INT NOT NULL,
+                summary TEXT NOT NULL,
+                details JSON NOT NULL,
+                nonverbal JSON NOT NULL,
+                verbal JSON NOT NULL,
+                video_url VARCHAR(1024),
+                INDEX idx_evaluations_user_date (username, eval_date, id)
+            ) DEFAULT CHARSET=utf8mb4
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS score_trend (
+                username VARCHAR(255) NOT NULL,
+                eval_date DATE NOT NULL,
+                sessions INT NOT NULL,
+                total_sum INT NOT NULL,
+                PRIMARY KEY (username, eval_date)
+            ) DEFAULT CHARSET=utf8mb4
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS evaluation_versions (
+                username VARCHAR(255) PRIMARY KEY,
+                version BIGINT NOT NULL
+            ) DEFAULT CHARSET=utf8mb4
+            """,
+        ],
+    }
+
+    def add(self, username, eval_date, evaluation):
+        # 평가 저장, 일자별 추이 누적, version 증가를 한 트랜잭션으로 처리한다
+        eval_date = str(eval_date)
+        total = evaluation["total"]
+        with self.transaction("add_evaluation") as tx:
+            tx.execute("insert_evaluation", (
+                username,
+                eval_date,
+                total,
+                evaluation["summary"],
+                json.dumps(evaluation["details"], ensure_ascii=False),
+                json.dumps(evaluation["nonverbal"], ensure_ascii=False),
+                json.dumps(evaluation["verbal"], ensure_ascii=False),
+                evaluation.get("nonverbal_video_url"),
+            ))
+            tx.execute("upsert_trend", (username, eval_date, total))
+            tx.execute("upsert_version", (username,))
+
+    def version(self, username):
+        row = self.fetchone("version", (username,))
+        return row["version"] if row else 0
+
+    def history(self, username, after=None, limit=PAGE_SIZE):
+        # after에는 이전 페이지 마지막 행의 (eval_date, id)를 넘긴다
+        if after is None:
+            rows = self.fetchall("history_first", (username, limit))
+        else:
+            eval_date, last_id = after
+            rows = self.fetchall("history_after", (username, eval_date, eval_date, last_id, limit))
+        return [{**row, "eval_date": str(row["eval_date"])} for row in rows]
+
+    def get(self, username, evaluation_id):
+        row = self.fetchone("evaluation", (evaluation_id, username))
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "date": str(row["eval_date"]),
+            "total": row["total"],
+            "summary": row["summary"],
+            "details": _rows(row["details"]),
+            "nonverbal": _rows(row["nonverbal"]),
+            "verbal": _rows(row["verbal"]),
+            "nonverbal_video_url": row["video_url"],
+        }
+
+    def trend(self, username):
+        # 하루에 여러 번 면접을 본 경우 그날의 평균 점수
+        return [
+            (str(row["eval_date"]), row["total_sum"] / row["sessions"])
+            for row in self.fetchall("trend", (username,))
+        ]
+
+    def seed(self, username, evaluation_by_date):
+        # 기록이 없는 사용자에게 예시 평가(dummydata)를 넣어 대시보드를 채운다
+        if self.version(username):
+            return
+        for eval_date, evaluation in sorted(evaluation_by_date.items()):
+            self.add(username, eval_date, evaluation)
+
+
+def _rows(value):
+    # MySQL JSON 컬럼은 드라이버에 따라 str로, SQLite TEXT는 항상 str로 돌아온다
+    if isinstance(value, (bytes, str)):
+        value = json.loads(value)
+    return [tuple(row) for row in value]
@@ -1,42 +1,132 @@
+import os
+import time
 import streamlit as st
-import pymysql
 import bcrypt
+import requests
 from dummydata import *
+from repository import DB_BACKEND, UserRepository, create_pool
+from evaluation_store import EvaluationStore, PAGE_SIZE
 import pandas as pd
-
-# --- DB 연결 함수 ---
-def get_connection():
-    return pymysql.connect(
-        host='localhost',
-        user='root',
-        password='ankh6425',
-        database='test',
-        charset='utf8mb4',
-        cursorclass=pymysql.cursors.DictCursor
+import plotly.graph_objects as go
+
+# --- DB 연결 풀 (rerun마다 새로 연결하지 않도록 프로세스 전체에서 한 번만 생성) ---
+@st.cache_resource
+def get_user_repository():
+    return UserRepository(create_pool())
+
+@st.cache_resource
+def get_evaluation_store():
+    return EvaluationStore(get_user_repository().pool)
+
+# --- 평가 기록 캐시 ---
+# version은 새 평가가 저장될 때만 바뀌므로, 같은 version이면 rerun해도 쿼리/그래프 생성을 다시 하지 않는다
+@st.cache_resource(max_entries=256)
+def get_trend_figure(username, version):
+    df = pd.DataFrame(get_evaluation_store().trend(username), columns=['일자', '종합점수'])
+    df['일자'] = pd.to_datetime(df['일자'])
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=df['일자'],
+        y=df['종합점수'],
+        mode='lines+markers',
+        name='종합점수',
+        line=dict(width=3)
+    ))
+    fig.update_layout(
+        xaxis=dict(title='날짜', type='date'),
+        yaxis=dict(title='종합점수'),
+        height=450,
+        margin=dict(t=50, b=50)
     )
+    return fig
+
+@st.cache_data(max_entries=1024)
+def get_history_page(username, version, after):
+    return get_evaluation_store().history(username, after)
+
+# 저장된 평가는 바뀌지 않으므로 id만으로 캐시한다
+@st.cache_data(max_entries=1024)
+def get_evaluation(username, evaluation_id):
+    data = get_evaluation_store().get(username, evaluation_id)
+    tables = {
+        key: pd.DataFrame(data[key], columns=["항목", "점수", "피드백"])
+        for key in ("details", "nonverbal", "verbal")
+    }
+    return data, tables
+
+def select_evaluation(username, label, key):
+    # 최신 기록부터 PAGE_SIZE개씩 보여주고, 이전 페이지 마지막 행을 커서로 다음 페이지를 읽는다
+    version = get_evaluation_store().version(username)
+    cursors = st.session_state.setdefault(f"{key}_cursors", [None])
+    page = get_history_page(username, version, cursors[-1])
+    if not page:
+        st.info("아직 평가 기록이 없습니다.")
+        return None
+
+    col_newer, col_older = st.columns(2)
+    if len(cursors) > 1 and col_newer.button("◀ 최근 기록", key=f"{key}_newer"):
+        cursors.pop()
+        st.rerun()
+    if len(page) == PAGE_SIZE and col_older.button("이전 기록 ▶", key=f"{key}_older"):
+        cursors.append((page[-1]["eval_date"], page[-1]["id"]))
+        st.rerun()
+
+    labels = {row["id"]: f"{row['eval_date']} ({row['total']}점)" for row in page}
+    evaluation_id = st.selectbox(label, list(labels), format_func=labels.get, key=key)
+    return get_evaluation(username, evaluation_id)
+
+# --- 영상 분석 API (청크 업로드 후 진행률 조회) ---
+API_URL = os.environ.get("API_URL", "http://localhost:8000")
+# 예시 평가(dummydata)로 빈 대시보드를 채우는 데모 모드 (로컬 SQLite이거나 DEMO_DATA=1일 때만, 운영 DB에는 넣지 않는다)
+DEMO_DATA = os.environ.get("DEMO_DATA", "").lower() in ("1", "true", "yes", "on") or DB_BACKEND == "sqlite"
+UPLOAD_CHUNK_BYTES = 4 * 1024 * 1024
+# 분석 진행률이 이 시간 동안 그대로면(분석하던 API 워커가 재시작된 경우 등) 실패로 보고 기다리지 않는다
+ANALYSIS_STALL_SECONDS = int(os.environ.get("ANALYSIS_STALL_SECONDS", 300))
+
+def upload_video(file, on_progress):
+    # 파일을 한 번에 보내지 않고 청크 단위로 보내 API 서버가 받는 대로 디스크에 쓰게 한다
+    upload_id = requests.post(f"{API_URL}/uploads", timeout=10).json()["upload_id"]
+    offset = 0
+    file.seek(0)
+    while chunk := file.read(UPLOAD_CHUNK_BYTES):
+        response = requests.put(f"{API_URL}/uploads/{upload_id}", params={"offset": offset}, data=chunk, timeout=60)
+        response.raise_for_status()
+        offset = response.json()["received"]
+        on_progress(min(1.0, offset / file.size))
+    requests.post(f"{API_URL}/uploads/{upload_id}/complete", timeout=10).raise_for_status()
+    return upload_id
+
+def wait_for_analysis(upload_id, on_progress):
+    progress, deadline = None, time.monotonic() + ANALYSIS_STALL_SECONDS
+    while True:
+        response = requests.get(f"{API_URL}/uploads/{upload_id}", timeout=10)
+        response.raise_for_status()
+        status = response.json()
+        on_progress(status["progress"])
+        if status["state"] in ("done", "failed"):
+            return status
+        if status["progress"] != progress:
+            progress, deadline = status["progress"], time.monotonic() + ANALYSIS_STALL_SECONDS
+        elif time.monotonic() > deadline:
+            return {**status, "state": "failed", "error": f"{ANALYSIS_STALL_SECONDS}초 동안 분석이 진행되지 않았습니다."}
+        time.sleep(1)
 
 # --- 유틸 함수 ---
 def user_exists(username):
-    with get_connection() as conn:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT * FROM users WHERE username=%s", (username,))
-            return cursor.fetchone() is not None
+    return get_user_repository().exists(username)
 
 def register_user(username, password):
     hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
-    with get_connection() as conn:
-        with conn.cursor() as cursor:
-            cursor.execute("INSERT INTO users (username, password_hash) VALUES (%s, %s)", (username, hashed_pw))
-        conn.commit()
+    get_user_repository().add(username, hashed_pw.decode())
 
 def login_user(username, password):
-    with get_connection() as conn:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT password_hash FROM users WHERE username=%s", (username,))
-            user = cursor.fetchone()
-            if user and bcrypt.checkpw(password.encode(), user['password_hash'].encode()):
-                return True
-    return False
+    password_hash = get_user_repository().password_hash(username)
+    if password_hash is None:
+        return False
+    if isinstance(password_hash, str):
+        password_hash = password_hash.encode()
+    return bcrypt.checkpw(password.encode(), password_hash)
 
 # --- 세션 상태 초기화 ---
 if "logged_in" not in st.session_state:
@@ -84,65 +174,40 @@ if st.session_state.page == "main":
         st.subheader("📘 학습정보")
         st.markdown("### 📊 일자별 종합점수 추이")
 
-        # 예시 데이터 생성
-        import pandas as pd
-        import plotly.graph_objects as go
-
-        dates = pd.date_range(start='2025-07-01', periods=5, freq='D')  # 시계열 날짜
-        scores = [72, 78, 81, 77, 85]
-        df = pd.DataFrame({
-            '일자': dates,
-            '종합점수': scores
-        })
-
-        # 그래프 생성
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=df['일자'],
-            y=df['종합점수'],
-            mode='lines+markers',
-            name='종합점수',
-            line=dict(width=3)
-        ))
-        fig.update_layout(
-            xaxis=dict(title='날짜', type='date'),
-            yaxis=dict(title='종합점수'),
-            height=450,
-            margin=dict(t=50, b=50)
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
+        username = st.session_state.username
+        version = get_evaluation_store().version(username)
+        if version:
+            st.plotly_chart(get_trend_figure(username, version), use_container_width=True)
         # ========================
         # 2. 날짜 선택
         # ========================
         st.markdown("---")
         st.markdown("### 📅 일자 선택")
-        selected_date = st.selectbox("평가 내용을 확인할 날짜를 선택하세요:", list(evaluation_by_date.keys()))
-
-        # ========================
-        # 3. 종합 평가
-        # ========================
-        data = evaluation_by_date[selected_date]
-        st.markdown("### ✅ 종합 평가")
-        st.markdown(f"**{data['total']}점 / 100점 만점**")
-        st.markdown(data['summary'])
-
-        # ========================
-        # 4. 세부 평가
-        # ========================
-        st.markdown("### 📋 세부 평가 요약")
-        detail_df = pd.DataFrame(data['details'], columns=["항목", "점수", "피드백"])
-        st.table(detail_df)
-
-        # --- 5. 비언어적 표현 피드백 ---
-        st.markdown("### 🗣️ 비언어적 표현 피드백")
-        df_nonverbal = pd.DataFrame(data["nonverbal"], columns=["항목", "점수", "피드백"])
-        st.table(df_nonverbal)
-
-        # --- 6. 언어적 표현 피드백 ---
-        st.markdown("### 🧠 언어적 표현 피드백")
-        df_verbal = pd.DataFrame(data["verbal"], columns=["항목", "점수", "피드백"])
-        st.table(df_verbal)
+        selected = select_evaluation(username, "평가 내용을 확인할 날짜를 선택하세요:", "main_date")
+
+        if selected is not None:
+            data, tables = selected
+
+            # ========================
+            # 3. 종합 평가
+            # ========================
+            st.markdown("### ✅ 종합 평가")
+            st.markdown(f"**{data['total']}점 / 100점 만점**")
+            st.markdown(data['summary'])
+
+            # ========================
+            # 4. 세부 평가
+            # ========================
+            st.markdown("### 📋 세부 평가 요약")
+            st.table(tables["details"])
+
+            # --- 5. 비언어적 표현 피드백 ---
+            st.markdown("### 🗣️ 비언어적 표현 피드백")
+            st.table(tables["nonverbal"])
+
+            # --- 6. 언어적 표현 피드백 ---
+            st.markdown("### 🧠 언어적 표현 피드백")
+            st.table(tables["verbal"])
     else:
         st.info("로그인 후 더 많은 기능을 이용해보세요!")
 elif st.session_state.page == "video":
@@ -157,8 +222,31 @@ elif st.session_state.page == "video":
                 uploaded_video = st.file_uploader("분석할 영상을 업로드하세요", type=["mp4", "mov", "webm"])
 
                 if uploaded_video is not None:
-                    st.success("✅ 영상이 성공적으로 업로드되었습니다.")
                     st.video(uploaded_video)
+
+                    if st.button("🔍 영상 분석 시작"):
+                        bar = st.progress(0.0, text="업로드 중...")
+                        try:
+                            upload_id = upload_video(
+                                uploaded_video, lambda p: bar.progress(p, text=f"업로드 중... {p:.0%}"))
+                            st.session_state.video_analysis = wait_for_analysis(
+                                upload_id, lambda p: bar.progress(p, text=f"분석 중... {p:.0%}"))
+                        except requests.HTTPError as e:
+                            st.session_state.video_analysis = None
+                            st.error(f"영상 분석 요청이 실패했습니다: {e.response.status_code}")
+                        except requests.RequestException:
+                            st.session_state.video_analysis = None
+                            st.error("분석 서버에 연결할 수 없습니다.")
+
+                    analysis = st.session_state.get("video_analysis")
+                    if analysis and analysis["state"] == "failed":
+                        st.error(f"영상 분석에 실패했습니다: {analysis['error']}")
+                    elif analysis:
+                        st.success("✅ 영상 분석이 완료되었습니다.")
+                        st.markdown("#### 📋 비언어 표현 분석 결과")
+                        st.table(pd.DataFrame(analysis["result"]["nonverbal"], columns=["항목", "점수", "피드백"]))
+                        st.markdown("#### 📝 답변 내용")
+                        st.markdown(analysis["result"]["transcript"] or "인식된 음성이 없습니다.")
                 else:
                     st.info("업로드할 영상 파일을 선택하세요. (지원 형식: mp4, mov, webm)")
 
@@ -166,22 +254,19 @@ elif st.session_state.page == "video":
         with tabs[1]:
             st.subheader("📅 최근 분석 기록")
 
-            selected_date = st.selectbox("날짜를 선택하세요:", list(evaluation_by_date.keys()), key="video_date")
+            selected = select_evaluation(st.session_state.username, "날짜를 선택하세요:", "video_date")
 
-            # 선택한 날짜의 비언어 피드백 데이터
-            nonverbal_data = evaluation_by_date[selected_date]["nonverbal"]
+            if selected is not None:
+                data, tables = selected
 
-            # === 1. 분석 영상 표시 ===
-            # 같은 날짜의 첫 번째 항목에 있는 영상 URL 사용
-            video_url = evaluation_by_date[selected_date].get("nonverbal_video_url")
-            if video_url:
-                st.video(video_url)
+                # === 1. 분석 영상 표시 ===
+                video_url = data.get("nonverbal_video_url")
+                if video_url:
+                    st.video(video_url)
 
-            # === 2. 피드백 표로 정리 ===
-            st.markdown("#### 📋 비언어 표현 분석 결과")
-            data = evaluation_by_date[selected_date]
-            df_nonverbal = pd.DataFrame(data["nonverbal"], columns=["항목", "점수", "피드백"])
-            st.table(df_nonverbal)
+                # === 2. 피드백 표로 정리 ===
+                st.markdown("#### 📋 비언어 표현 분석 결과")
+                st.table(tables["nonverbal"])
     else:
         st.info("로그인 후 더 많은 기능을 이용해보세요!")
 elif st.session_state.page == "answer":
@@ -213,6 +298,7 @@ elif st.session_state.page == "answer":
                 if user_input:
                     st.session_state.chat_answer = user_input
                     st.session_state.chat_submitted = True
+                    st.session_state.pop("chat_analysis", None)
 
             # 3. 답변/분석 출력
             if st.session_state.chat_submitted:
@@ -221,15 +307,18 @@ elif st.session_state.page == "answer":
 
                 with st.chat_message("assistant"):
                     st.markdown("### 📊 답변 분석 결과")
-                    st.markdown("""
-                        - **핵심 논리 명확도**: 85점  
-                        - **구조적 표현력**: 80점  
-                        - **키워드 활용도**: 78점  
-    
-                        **💡 피드백 요약**  
-                        - 논리적인 구조는 안정적이나 마무리에서 약간 흐름이 약해졌습니다.  
-                        - 실무 경험을 연결하면 더 설득력이 높아질 수 있습니다.
-                        """)
+                    try:
+                        if "chat_analysis" not in st.session_state:
+                            response = requests.post(
+                                f"{API_URL}/verbal", json={"text": st.session_state.chat_answer}, timeout=10)
+                            response.raise_for_status()
+                            st.session_state.chat_analysis = response.json()
+                        analysis = st.session_state.chat_analysis
+                        st.table(pd.DataFrame(analysis["verbal"], columns=["항목", "점수", "피드백"]))
+                        if analysis["verbal_stats"]["terms"]:
+                            st.markdown("**💡 사용한 기술 용어**: " + ", ".join(analysis["verbal_stats"]["terms"]))
+                    except requests.RequestException:
+                        st.error("분석 서버에 연결할 수 없습니다.")
 
                 # 4. ✅ 추가 질문 생성 버튼 (조건부 표시)
                 if not st.session_state.follow_up:
@@ -241,13 +330,12 @@ elif st.session_state.page == "answer":
         with tabs[1]:
             st.subheader("📅 언어적 표현 분석 기록")
 
-            selected_date = st.selectbox("날짜를 선택하세요:", list(evaluation_by_date.keys()), key="answer_date")
-
-            verbal_data = evaluation_by_date[selected_date]["verbal"]
-            df_verbal = pd.DataFrame(verbal_data, columns=["항목", "점수", "피드백"])
+            selected = select_evaluation(st.session_state.username, "날짜를 선택하세요:", "answer_date")
 
-            st.markdown(f"#### 📆 선택 날짜: `{selected_date}`")
-            st.table(df_verbal)
+            if selected is not None:
+                data, tables = selected
+                st.markdown(f"#### 📆 선택 날짜: `{data['date']}`")
+                st.table(tables["verbal"])
 
     else:
         st.info("로그인 후 더 많은 기능을 이용해보세요!")
@@ -270,6 +358,9 @@ elif st.session_state.page == "login":
     password = st.text_input("비밀번호", type="password", key="login_pass")
     if st.button("로그인"):
         if login_user(username, password):
+            # 데모 모드에서는 기록이 없는 사용자를 예시 평가로 채운다
+            if DEMO_DATA:
+                get_evaluation_store().seed(username, evaluation_by_date)
             st.session_state.logged_in = True
             st.session_state.username = username
             st.success("로그인 성공!")
@@ -0,0 +1,267 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# --- DB 설정 (DB_BACKEND=sqlite면 로컬/테스트용 SQLite 파일 사용) ---
+DB_BACKEND = os.environ.get("DB_BACKEND", "mysql")
+DB_HOST = os.environ.get("DB_HOST", "localhost")
+DB_USER = os.environ.get("DB_USER", "root")
+DB_PASSWORD = os.environ.get("DB_PASSWORD", "ankh6425")
+DB_NAME = os.environ.get("DB_NAME", "test")
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "interview.db")
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 4))
+# 풀이 가득 찼을 때 반납을 기다리는 최대 시간(초)
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+
+
+class MySQLBackend:
+    name = "mysql"
+    paramstyle = "%s"
+
+    def connect(self):
+        import pymysql
+
+        return pymysql.connect(
+            host=DB_HOST,
+            user=DB_USER,
+            password=DB_PASSWORD,
+            database=DB_NAME,
+            charset='utf8mb4',
+            cursorclass=pymysql.cursors.DictCursor,
+            autocommit=False,
+        )
+
+    def check(self, conn):
+        # 풀에 오래 있던 연결은 서버가 끊었을 수 있으므로 꺼낼 때 확인하고 필요하면 다시 연결한다
+        conn.ping(reconnect=True)
+
+
+class SQLiteBackend:
+    name = "sqlite"
+    paramstyle = "?"
+
+    def __init__(self, path):
+        self.path = path
+
+    def connect(self):
+        # Streamlit은 rerun마다 다른 스레드에서 스크립트를 실행하므로 스레드 간 공유를 허용한다
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def check(self, conn):
+        pass
+
+
+class ConnectionPool:
+    """프로세스 전체에서 공유하는 연결 풀. 연결은 처음 필요할 때 만들고 반납받아 재사용한다."""
+
+    def __init__(self, backend, size=4, timeout=30.0):
+        self.backend = backend
+        self.size = size
+        self.timeout = timeout
+        # 최근에 반납된 연결부터 다시 쓴다 (LIFO)
+        self._idle = []
+        self._created = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                # 롤백도 되지 않는 연결은 풀에 돌려놓지 않는다
+                self._discard(conn)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                with self._cond:
+                    self._idle.append(conn)
+                    self._cond.notify()
+
+    def _acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                # 쉬는 연결도 없고 새로 만들 자리도 없으면 반납되거나 자리가 빌 때까지 기다린다
+                while not self._idle and self._created >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"DB 연결 풀에서 {self.timeout:g}초 안에 연결을 얻지 못했습니다")
+                    self._cond.wait(remaining)
+                conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    self._created += 1
+
+            if conn is None:
+                try:
+                    return self.backend.connect()
+                except Exception:
+                    self._discard(None)
+                    raise
+            try:
+                self.backend.check(conn)
+                return conn
+            except Exception as e:
+                # 끊긴 연결은 버리고 그 자리에 새 연결을 연다
+                print("⚠️ DB 연결 확인 실패, 다시 연결합니다:", e)
+                self._discard(conn)
+
+    def _discard(self, conn):
+        # 자리를 비우고 기다리던 스레드를 깨워 새 연결을 만들게 한다
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+class QueryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    @contextmanager
+    def time(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                stat = self._stats.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+                stat["count"] += 1
+                stat["total_ms"] += elapsed * 1000
+                stat["max_ms"] = max(stat["max_ms"], elapsed * 1000)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {**stat, "avg_ms": stat["total_ms"] / stat["count"]}
+                for name, stat in self._stats.items()
+            }
+
+
+class Transaction:
+    def __init__(self, repository, cursor):
+        self.repository = repository
+        self.cursor = cursor
+
+    def execute(self, name, params=()):
+        self.cursor.execute(self.repository.queries[name], params)
+        return self.cursor.rowcount
+
+    def fetchone(self, name, params=()):
+        self.cursor.execute(self.repository.queries[name], params)
+        row = self.cursor.fetchone()
+        return dict(row) if row is not None else None
+
+    def fetchall(self, name, params=()):
+        self.cursor.execute(self.repository.queries[name], params)
+        return [dict(row) for row in self.cursor.fetchall()]
+
+
+class Repository:
+    """쿼리 실행 창구. 모든 쿼리는 풀에서 꺼낸 연결로 실행하고 쿼리별 소요 시간을 기록한다.
+
+    하위 클래스는 QUERIES(%s placeholder)와 백엔드별 SCHEMA를 정의한다. 문법이 백엔드마다 다른 쿼리는
+    {"mysql": ..., "sqlite": ...}로 둔다. 쿼리의 placeholder 변환과 스키마 생성은 저장소를 만들 때 한 번만 한다.
+    """
+
+    QUERIES = {}
+    SCHEMA = {}
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.stats = QueryStats()
+        backend = pool.backend.name
+        self.queries = {
+            name: (sql[backend] if isinstance(sql, dict) else sql).replace("%s", pool.backend.paramstyle)
+            for name, sql in self.QUERIES.items()
+        }
+        statements = self.SCHEMA.get(pool.backend.name, ())
+        if statements:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    for statement in statements:
+                        cursor.execute(statement)
+                finally:
+                    cursor.close()
+                conn.commit()
+
+    @contextmanager
+    def transaction(self, name):
+        # 여러 쿼리를 연결 하나, 트랜잭션 하나로 묶는다 (시간은 name 하나로 기록)
+        with self.stats.time(name), self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                yield Transaction(self, cursor)
+            finally:
+                cursor.close()
+            # 풀에서 재사용되는 연결이 이전 트랜잭션의 스냅샷을 계속 보지 않도록 읽기 후에도 끝낸다
+            conn.commit()
+
+    def fetchone(self, name, params=()):
+        with self.transaction(name) as tx:
+            return tx.fetchone(name, params)
+
+    def fetchall(self, name, params=()):
+        with self.transaction(name) as tx:
+            return tx.fetchall(name, params)
+
+    def execute(self, name, params=()):
+        with self.transaction(name) as tx:
+            return tx.execute(name, params)
+
+
+class UserRepository(Repository):
+    QUERIES = {
+        "user_exists": "SELECT 1 FROM users WHERE username=%s LIMIT 1",
+        "insert_user": "INSERT INTO users (username, password_hash) VALUES (%s, %s)",
+        "password_hash": "SELECT password_hash FROM users WHERE username=%s",
+    }
+    SCHEMA = {
+        "sqlite": [
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL UNIQUE,
+                password_hash TEXT NOT NULL
+            )
+            """,
+        ],
+    }
+
+    def exists(self, username):
+        return self.fetchone("user_exists", (username,)) is not None
+
+    def add(self, username, password_hash):
+        self.execute("insert_user", (username, password_hash))
+
+    def password_hash(self, username):
+        row = self.fetchone("password_hash", (username,))
+        return row["password_hash"] if row else None
+
+
+def create_backend(name=None):
+    name = name or DB_BACKEND
+    if name == "sqlite":
+        return SQLiteBackend(SQLITE_PATH)
+    if name == "mysql":
+        return MySQLBackend()
+    raise ValueError(f"지원하지 않는 DB_BACKEND: {name}")
+
+
+def create_pool(backend=None, size=None):
+    return ConnectionPool(backend or create_backend(), size or DB_POOL_SIZE, DB_POOL_TIMEOUT)